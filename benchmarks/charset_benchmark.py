@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark decoding tafsir.app pages through response.text versus parsing
+the raw response bytes as UTF-8.
+
+For each page, a requests.Response is built the way the HTTP adapter
+would build it for three Content-Type headers. The per-page CPU cost of
+response.text followed by parse_tafsir_text() is compared with
+parse_tafsir_text(response.content), and the benchmark checks which paths
+produce the correct text.
+
+Usage:
+    python benchmarks/charset_benchmark.py [page.html ...]
+
+Without arguments a synthetic page roughly the size of a long Al-Razi
+entry is generated.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import parse_tafsir_text
+from parser_benchmark import synthetic_page
+
+CONTENT_TYPES = [
+    ("no Content-Type", None),
+    ("text/html", "text/html"),
+    ("text/html; charset=utf-8", "text/html; charset=utf-8"),
+]
+
+
+def make_response(body: bytes, content_type) -> requests.Response:
+    """Build a response with the encoding requests would derive from its headers"""
+    response = requests.Response()
+    response._content = body
+    response.status_code = 200
+    if content_type:
+        response.headers['Content-Type'] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def cpu_time_per_call(func, repeat: int, rounds: int = 5) -> float:
+    """Best average CPU time over several rounds, to filter out noise"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.process_time()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.process_time() - start) / repeat)
+    return best
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = [(path, Path(path).read_bytes()) for path in sys.argv[1:]]
+    else:
+        pages = [("synthetic", synthetic_page().encode('utf-8'))]
+
+    repeat = 10
+    for name, body in pages:
+        expected = parse_tafsir_text(body.decode('utf-8'))
+        print(f"{name}: {len(body) / 1e6:.2f} MB")
+
+        bytes_cost = cpu_time_per_call(lambda: parse_tafsir_text(make_response(body, None).content), repeat)
+        print(f"  {'bytes parsed as UTF-8':38} {bytes_cost * 1000:8.1f} ms CPU/page, correct text: "
+              f"{parse_tafsir_text(body) == expected}")
+
+        for label, content_type in CONTENT_TYPES:
+            text_cost = cpu_time_per_call(lambda: parse_tafsir_text(make_response(body, content_type).text), repeat)
+            correct = parse_tafsir_text(make_response(body, content_type).text) == expected
+            print(f"  {'response.text, ' + label:38} {text_cost * 1000:8.1f} ms CPU/page, correct text: {correct} "
+                  f"({text_cost / bytes_cost:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
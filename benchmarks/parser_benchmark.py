@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-page CPU cost of parsing tafsir.app pages.
+
+Compares the full BeautifulSoup parse with the lxml fast path used by
+parse_tafsir_text() and checks that both produce identical text.
+
+Usage:
+    python benchmarks/parser_benchmark.py [page.html ...]
+
+Without arguments a synthetic page roughly the size of a long Al-Razi
+entry is generated.
+"""
+
+import sys
+import time
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import _clean_tafsir_text, _full_parse_tafsir_text, _fast_parse_tafsir_text, parse_tafsir_text
+
+
+def synthetic_page(paragraphs: int = 4000) -> str:
+    """Build a page with the same layout as tafsir.app"""
+    sentence = "قوله تعالى ﴿ بِسْمِ اللَّهِ الرَّحْمَنِ الرَّحِيمِ ﴾ فيه مسائل: المسألة الأولى في تفسير الآية "
+    body = "\n".join(
+        f"<p class='t'>{sentence * 3}<span class='aya'>({i})</span> <!-- n{i} --> {sentence}</p>"
+        for i in range(paragraphs)
+    )
+    data = json.dumps({"ayah": "بِسْمِ اللَّهِ الرَّحْمَنِ الرَّحِيمِ", "surah": 1}, ensure_ascii=False)
+    return (
+        "<!DOCTYPE html><html><head><title>tafsir</title>"
+        "<script>window.app = {};</script><style>.t{margin:0}</style></head><body>"
+        "<nav>" + "<a href='#'>link</a>" * 200 + "</nav>"
+        f"<div id='preloaded-data'>{data}</div>"
+        f"<div id='preloaded-text'>{body}</div>"
+        "<footer>footer</footer></body></html>"
+    )
+
+
+def cpu_time_per_call(func, html_content: str, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        func(html_content)
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = [(path, Path(path).read_text(encoding='utf-8')) for path in sys.argv[1:]]
+    else:
+        pages = [("synthetic", synthetic_page())]
+
+    for name, html_content in pages:
+        expected = _clean_tafsir_text(_full_parse_tafsir_text(html_content))
+        fast = _fast_parse_tafsir_text(html_content)
+        identical = fast is not None and _clean_tafsir_text(fast) == expected
+        assert parse_tafsir_text(html_content) == expected
+
+        repeat = 5
+        full_cost = cpu_time_per_call(_full_parse_tafsir_text, html_content, repeat)
+        fast_cost = cpu_time_per_call(_fast_parse_tafsir_text, html_content, repeat)
+
+        print(f"{name}: {len(html_content.encode('utf-8')) / 1e6:.2f} MB, identical output: {identical}")
+        print(f"  BeautifulSoup parse: {full_cost * 1000:8.1f} ms CPU/page")
+        print(f"  lxml fast path:      {fast_cost * 1000:8.1f} ms CPU/page ({full_cost / fast_cost:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
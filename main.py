@@ -13,19 +13,63 @@ Usage:
 """
 
 import requests
+import urllib3
+import zlib
+import asyncio
 import json
 import time
 import os
 import csv
+import argparse
+import bisect
+import mmap
+import struct
+import sys
+import unicodedata
+import sqlite3
+import threading
+import io
+import itertools
+import math
+import collections
+import gzip
+import hashlib
+import queue
+import random
+import socket
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from bs4.builder import HTMLTreeBuilder
+import lxml.html
+from lxml import etree
+from urllib.parse import urljoin, urlsplit
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import logging
 from tqdm import tqdm
 import pandas as pd
 
+try:
+    import zstandard
+except ImportError:  # Optional, only needed for zstd-compressed output and downloads
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # Optional, only needed for brotli-compressed downloads
+    brotli = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional, only needed for Parquet export
+    pa = pq = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,6 +81,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class _Closeable:
+    """Mixin that makes a class with a close() method usable in a with statement"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 @dataclass
 class TafsirContent:
     """Data structure for storing tafsir content"""
@@ -51,6 +104,14 @@ class TafsirContent:
     tafsir_author: str
     url: str
     extraction_timestamp: str
+    tafsir_text_normalized: Optional[str] = None
+
+def content_to_dict(content: TafsirContent) -> dict:
+    """Serializable dict of a record, leaving out tafsir_text_normalized when no normalizer filled it in"""
+    data = asdict(content)
+    if data["tafsir_text_normalized"] is None:
+        del data["tafsir_text_normalized"]
+    return data
 
 @dataclass
 class SurahInfo:
@@ -61,253 +122,2144 @@ class SurahInfo:
     total_ayahs: int
     revelation_place: str
 
+# This is the standard Quran structure with ayah counts
+SURAH_DATA = [
+    (1, "الفاتحة", "Al-Fatihah", 7, "Makkah"),
+    (2, "البقرة", "Al-Baqarah", 286, "Madinah"),
+    (3, "آل عمران", "Aal-E-Imran", 200, "Madinah"),
+    (4, "النساء", "An-Nisa", 176, "Madinah"),
+    (5, "المائدة", "Al-Maidah", 120, "Madinah"),
+    (6, "الأنعام", "Al-An'am", 165, "Makkah"),
+    (7, "الأعراف", "Al-A'raf", 206, "Makkah"),
+    (8, "الأنفال", "Al-Anfal", 75, "Madinah"),
+    (9, "التوبة", "At-Tawbah", 129, "Madinah"),
+    (10, "يونس", "Yunus", 109, "Makkah"),
+    (11, "هود", "Hud", 123, "Makkah"),
+    (12, "يوسف", "Yusuf", 111, "Makkah"),
+    (13, "الرعد", "Ar-Ra'd", 43, "Madinah"),
+    (14, "إبراهيم", "Ibrahim", 52, "Makkah"),
+    (15, "الحجر", "Al-Hijr", 99, "Makkah"),
+    (16, "النحل", "An-Nahl", 128, "Makkah"),
+    (17, "الإسراء", "Al-Isra", 111, "Makkah"),
+    (18, "الكهف", "Al-Kahf", 110, "Makkah"),
+    (19, "مريم", "Maryam", 98, "Makkah"),
+    (20, "طه", "Taha", 135, "Makkah"),
+    (21, "الأنبياء", "Al-Anbiya", 112, "Makkah"),
+    (22, "الحج", "Al-Hajj", 78, "Madinah"),
+    (23, "المؤمنون", "Al-Mu'minun", 118, "Makkah"),
+    (24, "النور", "An-Nur", 64, "Madinah"),
+    (25, "الفرقان", "Al-Furqan", 77, "Makkah"),
+    (26, "الشعراء", "Ash-Shu'ara", 227, "Makkah"),
+    (27, "النمل", "An-Naml", 93, "Makkah"),
+    (28, "القصص", "Al-Qasas", 88, "Makkah"),
+    (29, "العنكبوت", "Al-Ankabut", 69, "Makkah"),
+    (30, "الروم", "Ar-Rum", 60, "Makkah"),
+    (31, "لقمان", "Luqman", 34, "Makkah"),
+    (32, "السجدة", "As-Sajdah", 30, "Makkah"),
+    (33, "الأحزاب", "Al-Ahzab", 73, "Madinah"),
+    (34, "سبأ", "Saba", 54, "Makkah"),
+    (35, "فاطر", "Fatir", 45, "Makkah"),
+    (36, "يس", "Ya-Sin", 83, "Makkah"),
+    (37, "الصافات", "As-Saffat", 182, "Makkah"),
+    (38, "ص", "Sad", 88, "Makkah"),
+    (39, "الزمر", "Az-Zumar", 75, "Makkah"),
+    (40, "غافر", "Ghafir", 85, "Makkah"),
+    (41, "فصلت", "Fussilat", 54, "Makkah"),
+    (42, "الشورى", "Ash-Shura", 53, "Makkah"),
+    (43, "الزخرف", "Az-Zukhruf", 89, "Makkah"),
+    (44, "الدخان", "Ad-Dukhan", 59, "Makkah"),
+    (45, "الجاثية", "Al-Jathiyah", 37, "Makkah"),
+    (46, "الأحقاف", "Al-Ahqaf", 35, "Makkah"),
+    (47, "محمد", "Muhammad", 38, "Madinah"),
+    (48, "الفتح", "Al-Fath", 29, "Madinah"),
+    (49, "الحجرات", "Al-Hujurat", 18, "Madinah"),
+    (50, "ق", "Qaf", 45, "Makkah"),
+    (51, "الذاريات", "Adh-Dhariyat", 60, "Makkah"),
+    (52, "الطور", "At-Tur", 49, "Makkah"),
+    (53, "النجم", "An-Najm", 62, "Makkah"),
+    (54, "القمر", "Al-Qamar", 55, "Makkah"),
+    (55, "الرحمن", "Ar-Rahman", 78, "Makkah"),
+    (56, "الواقعة", "Al-Waqiah", 96, "Makkah"),
+    (57, "الحديد", "Al-Hadid", 29, "Madinah"),
+    (58, "المجادلة", "Al-Mujadila", 22, "Madinah"),
+    (59, "الحشر", "Al-Hashr", 24, "Madinah"),
+    (60, "الممتحنة", "Al-Mumtahanah", 13, "Madinah"),
+    (61, "الصف", "As-Saff", 14, "Madinah"),
+    (62, "الجمعة", "Al-Jumu'ah", 11, "Madinah"),
+    (63, "المنافقون", "Al-Munafiqun", 11, "Madinah"),
+    (64, "التغابن", "At-Taghabun", 18, "Madinah"),
+    (65, "الطلاق", "At-Talaq", 12, "Madinah"),
+    (66, "التحريم", "At-Tahrim", 12, "Madinah"),
+    (67, "الملك", "Al-Mulk", 30, "Makkah"),
+    (68, "القلم", "Al-Qalam", 52, "Makkah"),
+    (69, "الحاقة", "Al-Haqqah", 52, "Makkah"),
+    (70, "المعارج", "Al-Ma'arij", 44, "Makkah"),
+    (71, "نوح", "Nuh", 28, "Makkah"),
+    (72, "الجن", "Al-Jinn", 28, "Makkah"),
+    (73, "المزمل", "Al-Muzzammil", 20, "Makkah"),
+    (74, "المدثر", "Al-Muddaththir", 56, "Makkah"),
+    (75, "القيامة", "Al-Qiyamah", 40, "Makkah"),
+    (76, "الإنسان", "Al-Insan", 31, "Madinah"),
+    (77, "المرسلات", "Al-Mursalat", 50, "Makkah"),
+    (78, "النبأ", "An-Naba", 40, "Makkah"),
+    (79, "النازعات", "An-Nazi'at", 46, "Makkah"),
+    (80, "عبس", "Abasa", 42, "Makkah"),
+    (81, "التكوير", "At-Takwir", 29, "Makkah"),
+    (82, "الانفطار", "Al-Infitar", 19, "Makkah"),
+    (83, "المطففين", "Al-Mutaffifin", 36, "Makkah"),
+    (84, "الانشقاق", "Al-Inshiqaq", 25, "Makkah"),
+    (85, "البروج", "Al-Buruj", 22, "Makkah"),
+    (86, "الطارق", "At-Tariq", 17, "Makkah"),
+    (87, "الأعلى", "Al-A'la", 19, "Makkah"),
+    (88, "الغاشية", "Al-Ghashiyah", 26, "Makkah"),
+    (89, "الفجر", "Al-Fajr", 30, "Makkah"),
+    (90, "البلد", "Al-Balad", 20, "Makkah"),
+    (91, "الشمس", "Ash-Shams", 15, "Makkah"),
+    (92, "الليل", "Al-Layl", 21, "Makkah"),
+    (93, "الضحى", "Ad-Duhaa", 11, "Makkah"),
+    (94, "الشرح", "Ash-Sharh", 8, "Makkah"),
+    (95, "التين", "At-Tin", 8, "Makkah"),
+    (96, "العلق", "Al-Alaq", 19, "Makkah"),
+    (97, "القدر", "Al-Qadr", 5, "Makkah"),
+    (98, "البينة", "Al-Bayyinah", 8, "Madinah"),
+    (99, "الزلزلة", "Az-Zalzalah", 8, "Madinah"),
+    (100, "العاديات", "Al-Adiyat", 11, "Makkah"),
+    (101, "القارعة", "Al-Qari'ah", 11, "Makkah"),
+    (102, "التكاثر", "At-Takathur", 8, "Makkah"),
+    (103, "العصر", "Al-Asr", 3, "Makkah"),
+    (104, "الهمزة", "Al-Humazah", 9, "Makkah"),
+    (105, "الفيل", "Al-Fil", 5, "Makkah"),
+    (106, "قريش", "Quraysh", 4, "Makkah"),
+    (107, "الماعون", "Al-Ma'un", 7, "Makkah"),
+    (108, "الكوثر", "Al-Kawthar", 3, "Makkah"),
+    (109, "الكافرون", "Al-Kafirun", 6, "Makkah"),
+    (110, "النصر", "An-Nasr", 3, "Madinah"),
+    (111, "المسد", "Al-Masad", 5, "Makkah"),
+    (112, "الإخلاص", "Al-Ikhlas", 4, "Makkah"),
+    (113, "الفلق", "Al-Falaq", 5, "Makkah"),
+    (114, "الناس", "An-Nas", 6, "Makkah")
+]
+
+# Built once at import and shared by every extractor
+SURAH_INFO: Dict[int, SurahInfo] = {
+    num: SurahInfo(num, ar_name, en_name, ayahs, place)
+    for num, ar_name, en_name, ayahs, place in SURAH_DATA
+}
+
+# Global ayah numbering (1..6236 in Mushaf order) via prefix sums of the ayah counts:
+# _SURAH_OFFSETS[surah] is the number of ayahs before that surah
+_SURAH_OFFSETS = [0] * (len(SURAH_DATA) + 2)
+for _num, _, _, _ayahs, _ in SURAH_DATA:
+    _SURAH_OFFSETS[_num + 1] = _SURAH_OFFSETS[_num] + _ayahs
+TOTAL_AYAHS = _SURAH_OFFSETS[-1]
+
+# Reverse lookup, _GLOBAL_AYAHS[i - 1] is the (surah, ayah) of global ayah i
+_GLOBAL_AYAHS: List[Tuple[int, int]] = [
+    (surah, ayah) for surah in SURAH_INFO for ayah in range(1, SURAH_INFO[surah].total_ayahs + 1)
+]
+
+def global_index(surah: int, ayah: int) -> int:
+    """Return the global ayah number (1..6236) of a surah/ayah pair"""
+    if surah not in SURAH_INFO:
+        raise ValueError(f"Invalid surah number: {surah}")
+    if not 1 <= ayah <= SURAH_INFO[surah].total_ayahs:
+        raise ValueError(f"Invalid ayah number {ayah} for surah {surah}")
+    return _SURAH_OFFSETS[surah] + ayah
+
+def from_global(index: int) -> Tuple[int, int]:
+    """Return the (surah, ayah) pair of a global ayah number"""
+    if not 1 <= index <= TOTAL_AYAHS:
+        raise ValueError(f"Invalid global ayah number: {index}")
+    return _GLOBAL_AYAHS[index - 1]
+
+def iter_ayahs(start: int = 1, end: int = TOTAL_AYAHS) -> Iterator[Tuple[int, int]]:
+    """Iterate over the (surah, ayah) pairs of an inclusive span of global ayah numbers"""
+    if not 1 <= start <= end <= TOTAL_AYAHS:
+        raise ValueError(f"Invalid global ayah span: {start}-{end}")
+    return iter(_GLOBAL_AYAHS[start - 1:end])
+
+def plan_shards(shard_count: int, weights: Optional[Sequence[float]] = None) -> List[Tuple[int, int]]:
+    """Split global ayahs 1..6236 into contiguous spans of roughly equal total weight
+    
+    `weights[i - 1]` is the expected cost of global ayah i, e.g. its page
+    size; without weights every ayah costs the same. Returns one inclusive
+    (start, end) span per shard. The plan only depends on its inputs, so
+    every node computes the same spans from the same weights.
+    """
+    if not 1 <= shard_count <= TOTAL_AYAHS:
+        raise ValueError(f"shard_count must be between 1 and {TOTAL_AYAHS}")
+    if weights is None:
+        weights = [1.0] * TOTAL_AYAHS
+    if len(weights) != TOTAL_AYAHS:
+        raise ValueError(f"Expected {TOTAL_AYAHS} weights, got {len(weights)}")
+    
+    cumulative = list(itertools.accumulate(max(float(weight), 0.0) for weight in weights))
+    total = cumulative[-1]
+    spans = []
+    start = 1
+    for shard in range(1, shard_count):
+        # End this shard where the running weight first reaches its fair share,
+        # leaving at least one ayah for each remaining shard
+        end = bisect.bisect_left(cumulative, total * shard / shard_count) + 1
+        end = max(start, min(end, TOTAL_AYAHS - (shard_count - shard)))
+        spans.append((start, end))
+        start = end + 1
+    spans.append((start, TOTAL_AYAHS))
+    return spans
+
+def page_size_weights(author: str, data_dir="data") -> List[float]:
+    """Per-ayah weights from the page sizes in an author's raw response cache
+    
+    Ayahs that are not cached get the mean size of the cached ones.
+    """
+    cache = RawResponseCache(Path(data_dir) / author / "raw")
+    sizes = []
+    for surah, ayah in iter_ayahs():
+        entry = cache.get(surah, ayah)
+        sizes.append(float(entry.size) if entry else None)
+    
+    known = [size for size in sizes if size is not None]
+    default = sum(known) / len(known) if known else 1.0
+    return [size if size is not None else default for size in sizes]
+
+def save_shard_plan(path, plan: List[Tuple[int, int]]):
+    """Write a shard plan so that every node can load the same spans"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([list(span) for span in plan], f, indent=2)
+
+def load_shard_plan(path) -> List[Tuple[int, int]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [tuple(span) for span in json.load(f)]
+
+# Tags whose strings BeautifulSoup's get_text() leaves out (script, style, template, ...)
+_SKIPPED_STRING_TAGS = frozenset(getattr(HTMLTreeBuilder, 'DEFAULT_STRING_CONTAINERS', {}))
+
+def _iter_element_strings(element):
+    """Yield the text nodes of an lxml element in the same order and with the
+    same exclusions as BeautifulSoup's get_text() on the equivalent tag"""
+    skip = element.tag in _SKIPPED_STRING_TAGS or any(
+        ancestor.tag in _SKIPPED_STRING_TAGS for ancestor in element.iterancestors()
+    )
+    if element.text and not skip:
+        yield element.text
+    
+    # Iterative walk so that the tail of each child comes after its subtree
+    stack = [(element, iter(element), skip)]
+    while stack:
+        node, children, skip = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if stack and node.tail and not stack[-1][2]:
+                yield node.tail
+            continue
+        
+        if isinstance(child.tag, str):
+            child_skip = skip or child.tag in _SKIPPED_STRING_TAGS
+            if child.text and not child_skip:
+                yield child.text
+            stack.append((child, iter(child), child_skip))
+        elif child.tail and not skip:
+            # Comments and processing instructions only contribute their tail
+            yield child.tail
+
+# lxml parser objects must not be shared between threads
+_html_parsers = threading.local()
+
+def _utf8_html_parser() -> lxml.html.HTMLParser:
+    """This thread's lxml parser for raw UTF-8 bytes, ignoring any <meta charset>"""
+    parser = getattr(_html_parsers, 'utf8', None)
+    if parser is None:
+        parser = _html_parsers.utf8 = lxml.html.HTMLParser(encoding='utf-8')
+    return parser
+
+def _fast_parse_tafsir_text(html_content: Union[str, bytes]) -> Optional[str]:
+    """Find the preloaded divs with lxml directly, skipping the BeautifulSoup tree
+    
+    Returns None if the page does not have the expected layout.
+    """
+    try:
+        if isinstance(html_content, bytes):
+            root = lxml.html.document_fromstring(html_content, parser=_utf8_html_parser())
+        else:
+            root = lxml.html.document_fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return None
+    return _tree_tafsir_text(root)
+
+def _tree_tafsir_text(root) -> Optional[str]:
+    """Find the preloaded divs in a parsed lxml tree, or return None if either is missing"""
+    ayah_divs = root.xpath('//div[@id="preloaded-data"]')
+    tafsir_divs = root.xpath('//div[@id="preloaded-text"]')
+    if not ayah_divs or not tafsir_divs:
+        return None
+    
+    # The ayah's JSON must be valid, although only the tafsir text is kept
+    json.loads(''.join(_iter_element_strings(ayah_divs[0])))
+    
+    # Extract tafsir text
+    return '\n'.join(_iter_element_strings(tafsir_divs[0]))
+
+def _full_parse_tafsir_text(html_content: Union[str, bytes]) -> str:
+    """Find the preloaded divs through a full BeautifulSoup parse"""
+    if isinstance(html_content, bytes):
+        soup = BeautifulSoup(html_content, 'lxml', from_encoding='utf-8')
+    else:
+        soup = BeautifulSoup(html_content, 'lxml')
+    
+    # The ayah's JSON must be valid, although only the tafsir text is kept
+    ayah_div = soup.find('div', id='preloaded-data')
+    json.loads(ayah_div.get_text())
+    
+    # Extract tafsir text
+    tafsir_div = soup.find('div', id='preloaded-text')
+    return tafsir_div.get_text(separator='\n')
+
+def parse_tafsir_text(html_content: Union[str, bytes]) -> str:
+    """Extract the cleaned tafsir text from a tafsir.app page
+    
+    Raw bytes are parsed as UTF-8 directly, without decoding them to a str
+    first. This is a module-level function so that it can run in a process
+    pool. Raises if the page does not contain the expected preloaded divs.
+    """
+    tafsir_text = _fast_parse_tafsir_text(html_content)
+    if tafsir_text is None:
+        logger.debug("Unexpected page layout, falling back to BeautifulSoup")
+        tafsir_text = _full_parse_tafsir_text(html_content)
+    
+    return _clean_tafsir_text(tafsir_text)
+
+def _clean_tafsir_text(tafsir_text: str) -> str:
+    """Strip every line and drop empty ones"""
+    lines = [line.strip() for line in tafsir_text.splitlines()]
+    return '\n'.join([line for line in lines if line])
+
+# Bytes read from the socket per step when streaming a page
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def stream_tafsir_text(chunks: Iterable[bytes]) -> Optional[str]:
+    """Extract the cleaned tafsir text from a page arriving as chunks of UTF-8 bytes
+    
+    The chunks are fed to an incremental lxml parser, and parsing stops as
+    soon as the preloaded-text div is complete, so the caller can stop
+    downloading the rest of the page. Gives the same text as
+    parse_tafsir_text(). If the divs come in an unexpected order, the
+    already parsed tree of the whole page is searched once the stream
+    ends, so the page never has to be downloaded again. Returns None if
+    the page does not contain both preloaded divs.
+    """
+    parser = etree.HTMLPullParser(events=('end',), tag='div', encoding='utf-8')
+    seen_data = False
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            element_id = element.get('id')
+            if element_id == 'preloaded-data':
+                # The ayah's JSON must be valid, although only the tafsir text is kept
+                json.loads(''.join(_iter_element_strings(element)))
+                seen_data = True
+            elif element_id == 'preloaded-text' and seen_data:
+                return _clean_tafsir_text('\n'.join(_iter_element_strings(element)))
+    
+    try:
+        root = parser.close()
+    except etree.LxmlError:
+        return None
+    tafsir_text = _tree_tafsir_text(root)
+    return _clean_tafsir_text(tafsir_text) if tafsir_text is not None else None
+
+class RateLimiter:
+    """Thread-safe token bucket rate limiter with a separate bucket per host
+    
+    Each host refills at `rate` requests per second up to `burst` tokens. A
+    caller reserves a token up front and only waits for the remaining deficit,
+    so time spent on the previous request counts towards the wait. The same
+    limiter can be shared by several threads and extractors.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1, host_rates: Optional[Dict[str, float]] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = dict(host_rates or {})
+        self._buckets: Dict[str, List[float]] = {}  # host -> [tokens, last refill time]
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_delay(cls, delay: float) -> Optional['RateLimiter']:
+        """Build a limiter equivalent to one request every `delay` seconds"""
+        return cls(rate=1.0 / delay) if delay > 0 else None
+    
+    def _reserve(self, url: str) -> float:
+        """Take one token for the url's host and return how long to wait before using it"""
+        host = urlsplit(url).netloc
+        rate = self.host_rates.get(host, self.rate)
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * rate) - 1
+            self._buckets[host] = [tokens, now]
+        # A negative balance is a reservation on tokens that have not been refilled yet
+        return -tokens / rate if tokens < 0 else 0.0
+    
+    def acquire(self, url: str):
+        """Block until a request to the url's host is allowed"""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or an HTTP date) into seconds from now"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+@dataclass
+class RetryPolicy:
+    """When to retry a failed request and how long to wait before it
+    
+    Attempt n waits a random time between 0 and
+    min(backoff_max, backoff_base * 2 ** (n - 1)) seconds ("full jitter"),
+    so clients that failed together do not retry in lockstep. A
+    Retry-After header sent by the server takes precedence, capped at
+    max_retry_after. Use RetryPolicy(max_attempts=1) to disable retries.
+    """
+    max_attempts: int = 4
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    retry_exceptions: Tuple[type, ...] = (requests.exceptions.ConnectionError,
+                                          requests.exceptions.Timeout,
+                                          requests.exceptions.ChunkedEncodingError,
+                                          requests.exceptions.ContentDecodingError)
+    max_retry_after: float = 300.0
+    
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if self.backoff_base < 0 or self.backoff_max < 0:
+            raise ValueError("backoff times cannot be negative")
+    
+    def is_retryable(self, response: Optional[requests.Response] = None,
+                     error: Optional[BaseException] = None) -> bool:
+        """Whether a failed attempt (an error response or an exception) is worth retrying"""
+        if error is not None:
+            return isinstance(error, self.retry_exceptions)
+        return response is not None and response.status_code in self.retry_statuses
+    
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait after the given (1-based) failed attempt"""
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker with a separate circuit per host
+    
+    After failure_threshold consecutive failures the host's circuit opens
+    and no requests are sent to it for reset_timeout seconds. Then a single
+    trial request is let through (half-open): if it succeeds the circuit
+    closes again, otherwise it stays open for another reset_timeout. This
+    keeps a crawl from hammering a server that is already struggling.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if reset_timeout <= 0:
+            raise ValueError("reset_timeout must be positive")
+        
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, List] = {}  # host -> [consecutive failures, opened at, trial in flight]
+        self._lock = threading.Lock()
+    
+    def _circuit(self, url: str) -> List:
+        return self._hosts.setdefault(urlsplit(url).netloc, [0, None, False])
+    
+    def state(self, url: str) -> str:
+        """Current state of the url's host: "closed", "open" or "half-open\""""
+        with self._lock:
+            failures, opened_at, _ = self._circuit(url)
+            if opened_at is None:
+                return "closed"
+            return "open" if time.monotonic() - opened_at < self.reset_timeout else "half-open"
+    
+    def reserve(self, url: str) -> float:
+        """Return 0 if a request to the url's host may be sent now, otherwise how long to wait
+        
+        A caller that gets 0 while the circuit is half-open holds the trial
+        request and must report its outcome with record_success/record_failure.
+        """
+        with self._lock:
+            circuit = self._circuit(url)
+            _, opened_at, trial_in_flight = circuit
+            if opened_at is None:
+                return 0.0
+            remaining = opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if trial_in_flight:
+                # Check back shortly for the outcome of the trial request
+                return min(1.0, self.reset_timeout)
+            circuit[2] = True
+            return 0.0
+    
+    def wait(self, url: str):
+        """Block until a request to the url's host may be sent"""
+        delay = self.reserve(url)
+        while delay > 0:
+            time.sleep(delay)
+            delay = self.reserve(url)
+    
+    def record_success(self, url: str):
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit[1] is not None:
+                logger.info(f"Circuit for {urlsplit(url).netloc} closed")
+            circuit[:] = [0, None, False]
+    
+    def record_failure(self, url: str):
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit[0] += 1
+            if circuit[2] or (circuit[1] is None and circuit[0] >= self.failure_threshold):
+                logger.warning(f"Circuit for {urlsplit(url).netloc} opened after {circuit[0]} consecutive failures, "
+                               f"pausing requests for {self.reset_timeout:g}s")
+                circuit[1] = time.monotonic()
+            circuit[2] = False
+
+def _percentile(values: Iterable[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100) of the values, or None if there are none"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(q * len(ordered) / 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+@dataclass
+class _HostConcurrency:
+    """Per-host state of an AdaptiveConcurrencyLimiter"""
+    limit: float
+    latencies: collections.deque
+    outcomes: collections.deque
+    in_flight: int = 0
+    last_decrease: float = 0.0
+
+class AdaptiveConcurrencyLimiter:
+    """Thread-safe AIMD limit on the number of requests in flight per host
+    
+    Successes raise the limit additively; errors, throttling and slow responses cut it multiplicatively.
+    """
+    
+    THROTTLE_STATUSES = (429, 503)
+    
+    def __init__(self, initial_limit: int = 2, min_limit: int = 1, max_limit: int = 32,
+                 increase: float = 1.0, decrease_factor: float = 0.7,
+                 latency_tolerance: Optional[float] = 2.0, window: int = 200):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        if increase <= 0:
+            raise ValueError("increase must be positive")
+        
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+        self._hosts: Dict[str, _HostConcurrency] = {}
+        self._changed = threading.Condition()
+    
+    def _host(self, url: str) -> _HostConcurrency:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _HostConcurrency(
+                limit=float(self.initial_limit),
+                latencies=collections.deque(maxlen=self.window),
+                outcomes=collections.deque(maxlen=self.window)
+            )
+        return self._hosts[host]
+    
+    def acquire(self, url: str):
+        """Block until fewer requests than the limit are in flight to the url's host"""
+        with self._changed:
+            state = self._host(url)
+            while state.in_flight >= int(state.limit):
+                self._changed.wait()
+            state.in_flight += 1
+    
+    def classify(self, response: Optional[requests.Response], error: Optional[BaseException]) -> str:
+        """Classify a finished request as "ok", "throttled" or "error\""""
+        if error is not None or response is None:
+            return "error"
+        if response.status_code in self.THROTTLE_STATUSES:
+            return "throttled"
+        return "error" if response.status_code >= 500 else "ok"
+    
+    def release(self, url: str, latency: float, response: Optional[requests.Response] = None,
+                error: Optional[BaseException] = None):
+        """Free the request's slot and adjust the host's limit from its outcome"""
+        outcome = self.classify(response, error)
+        with self._changed:
+            state = self._host(url)
+            state.in_flight -= 1
+            state.outcomes.append(outcome)
+            
+            median = _percentile(state.latencies, 50) if len(state.latencies) >= 10 else None
+            stressed = outcome != "ok"
+            if outcome == "ok":
+                stressed = (self.latency_tolerance is not None and median is not None
+                            and latency > median * self.latency_tolerance)
+                state.latencies.append(latency)
+            
+            if stressed:
+                # Cut at most once per median round trip, so one burst of failures counts once
+                now = time.monotonic()
+                if now - state.last_decrease >= (median or latency):
+                    state.limit = max(float(self.min_limit), state.limit * self.decrease_factor)
+                    state.last_decrease = now
+                    logger.debug(f"Concurrency limit for {urlsplit(url).netloc} cut to {state.limit:.2f} ({outcome})")
+            else:
+                state.limit = min(float(self.max_limit), state.limit + self.increase / state.limit)
+            self._changed.notify_all()
+    
+    def limit(self, url: str) -> int:
+        """Current number of requests allowed in flight to the url's host"""
+        with self._changed:
+            return int(self._host(url).limit)
+    
+    def latency_percentile(self, url: str, q: float) -> Optional[float]:
+        """Recent latency percentile (q in 0-100) of the url's host in seconds"""
+        with self._changed:
+            return _percentile(self._host(url).latencies, q)
+    
+    def stats(self, url: str) -> Dict[str, Optional[float]]:
+        """Current limit, in-flight count, latency percentiles and error rates of the url's host"""
+        with self._changed:
+            state = self._host(url)
+            outcomes = list(state.outcomes)
+            latencies = list(state.latencies)
+            in_flight, limit = state.in_flight, state.limit
+        total = len(outcomes)
+        return {
+            "limit": round(limit, 2),
+            "in_flight": in_flight,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "error_rate": outcomes.count("error") / total if total else 0.0,
+            "throttle_rate": outcomes.count("throttled") / total if total else 0.0,
+        }
+
+class RequestHedger(_Closeable):
+    """Send a duplicate of requests that are slower than usual and keep the first usable response"""
+    
+    def __init__(self, percentile: float = 95.0, min_samples: int = 20, window: int = 200,
+                 max_workers: int = 64):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if min_samples < 1:
+            raise ValueError("min_samples must be at least 1")
+        
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.hedged = 0        # Requests that got a duplicate
+        self.hedge_wins = 0    # Requests answered by the duplicate
+        self._latencies: Dict[str, collections.deque] = {}
+        self._lock = threading.Lock()
+        # Both copies run here, so the caller can wait on them with a timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tafsir-hedge")
+    
+    def hedge_delay(self, url: str) -> Optional[float]:
+        """Seconds after which a request to the url's host is hedged, or None while there is too little data"""
+        with self._lock:
+            latencies = self._latencies.get(urlsplit(url).netloc)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            return _percentile(latencies, self.percentile)
+    
+    def record(self, url: str, latency: float):
+        with self._lock:
+            host = urlsplit(url).netloc
+            if host not in self._latencies:
+                self._latencies[host] = collections.deque(maxlen=self.window)
+            self._latencies[host].append(latency)
+    
+    def _timed(self, url: str, send, is_error):
+        started = time.monotonic()
+        response = send()
+        if not is_error(response):
+            self.record(url, time.monotonic() - started)
+        return response
+    
+    @staticmethod
+    def _is_error_response(response: requests.Response) -> bool:
+        return response.status_code == 429 or response.status_code >= 500
+    
+    def send(self, url: str, send, before_hedge=None, is_error=None):
+        """Call send() and, if it is slow, a second send() after before_hedge(url) (e.g. a rate limiter's acquire)
+        
+        is_error(response) tells which responses lose to a healthy one from
+        the other copy; by default 429 and 5xx responses do. Returns what
+        send() returned, and closes the response of a losing copy.
+        """
+        is_error = is_error or self._is_error_response
+        delay = self.hedge_delay(url)
+        primary = self._executor.submit(self._timed, url, send, is_error)
+        if delay is None:
+            return primary.result()
+        
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        if before_hedge:
+            before_hedge(url)
+        if primary.done():
+            return primary.result()
+        
+        logger.debug(f"Hedging slow request for {url} after {delay:.2f}s")
+        hedge = self._executor.submit(self._timed, url, send, is_error)
+        with self._lock:
+            self.hedged += 1
+        
+        pending = {primary, hedge}
+        failed: List[Future] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and not is_error(future.result()):
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    for loser in itertools.chain(pending, failed):
+                        self._discard(loser)
+                    return future.result()
+                failed.append(future)
+        
+        # Both copies failed: prefer an error response, which may carry Retry-After
+        responses = [future for future in failed if future.exception() is None]
+        if not responses:
+            raise failed[0].exception()
+        for loser in responses[1:]:
+            self._discard(loser)
+        return responses[0].result()
+    
+    @staticmethod
+    def _discard(future: Future):
+        """Cancel a losing copy, or close its response once it arrives"""
+        if future.cancel():
+            return
+        
+        def close(finished: Future):
+            if not finished.cancelled() and finished.exception() is None:
+                finished.result().close()
+        
+        future.add_done_callback(close)
+    
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Tafsir authors available on tafsir.app, keyed by their URL slug
+AVAILABLE_AUTHORS = {
+    "alaloosi": "Al-Alusi",
+    "alrazi": "Al-Razi", 
+    "ibn-katheer": "Ibn Katheer",
+    "tabari": "At-Tabari",
+    "qurtubi": "Al-Qurtubi",
+    "ibn-aashoor": "Ibn Ashur",
+    "iraab-daas": "Iraab ul Quran"
+}
+
+def _content_decoder(encoding: str):
+    """Return a function that decodes successive chunks of a body in the given
+    Content-Encoding, or None if the encoding is not supported here"""
+    if encoding == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+    if encoding == "br" and brotli is not None:
+        return brotli.Decompressor().process
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    return None
+
+# Errors raised by the decoders of _content_decoder() on a corrupt body
+_DECODE_ERRORS = tuple(error for error in (zlib.error, getattr(brotli, 'error', None),
+                                           getattr(zstandard, 'ZstdError', None)) if error)
+
+def accepted_encodings() -> List[str]:
+    """Content encodings that can be decoded here, most compact first
+    
+    gzip is always available; brotli needs `pip install brotli` and zstd
+    needs `pip install zstandard`.
+    """
+    return [encoding for encoding in ("zstd", "br", "gzip") if _content_decoder(encoding)]
+
+class _BodyReader:
+    """Iterate over the decoded body of a streamed response, counting the
+    bytes read from the connection and the bytes after decoding
+    
+    Bodies are read undecoded from urllib3 and decompressed chunk by chunk
+    here, since urllib3 does not count the bytes of chunked responses.
+    """
+    
+    def __init__(self, response: requests.Response, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.encoding = response.headers.get('Content-Encoding', 'identity').strip().lower() or 'identity'
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.complete = False  # Whether the whole body has been read
+    
+    def __iter__(self) -> Iterator[bytes]:
+        decode = None if self.encoding == 'identity' else _content_decoder(self.encoding)
+        if decode is None and self.encoding != 'identity':
+            # An encoding we did not ask for; let requests decode it without a wire size
+            for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                self.decoded_bytes += len(chunk)
+                yield chunk
+            self.wire_bytes = self.response.raw.tell() or self.decoded_bytes
+            self.complete = True
+            return
+        
+        try:
+            for data in self.response.raw.stream(self.chunk_size, decode_content=False):
+                self.wire_bytes += len(data)
+                chunk = decode(data) if decode else data
+                if chunk:
+                    self.decoded_bytes += len(chunk)
+                    yield chunk
+            self.complete = True
+        # Raise the same exceptions as requests' iter_content, so retries see them
+        except urllib3.exceptions.ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except urllib3.exceptions.ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        except urllib3.exceptions.SSLError as e:
+            raise requests.exceptions.SSLError(e)
+        except _DECODE_ERRORS as e:
+            raise requests.exceptions.ContentDecodingError(e)
+
+@dataclass
+class FetchResult:
+    """A response together with its body, which _send_request has already read and decoded"""
+    response: requests.Response     # Status, headers and final url
+    body: object                    # The body's bytes, or what the read function made of them
+    
+    def close(self):
+        self.response.close()
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Create a requests session with the browser User-Agent and a connection pool of the given size
+    
+    The session asks for every compressed encoding it can decode. Bodies
+    are decompressed while they are read, also when streaming.
+    """
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept-Encoding': ', '.join(accepted_encodings())
+    })
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    return session
+
+class TransferStats:
+    """Thread-safe tally of bytes on the wire versus decoded page bytes, per Content-Encoding"""
+    
+    def __init__(self):
+        self._totals: Dict[str, List[int]] = {}  # encoding -> [requests, wire bytes, decoded bytes]
+        self._lock = threading.Lock()
+    
+    def record(self, url: str, encoding: str, wire_bytes: int, decoded_bytes: int):
+        """Record the body of one response"""
+        logger.debug(f"{url}: {wire_bytes} bytes on the wire, {decoded_bytes} decoded ({encoding})")
+        with self._lock:
+            totals = self._totals.setdefault(encoding, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += wire_bytes
+            totals[2] += decoded_bytes
+    
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Requests, wire bytes and decoded bytes per content encoding, plus a "total" entry"""
+        with self._lock:
+            summary = {
+                encoding: {"requests": requests_count, "wire_bytes": wire, "decoded_bytes": decoded}
+                for encoding, (requests_count, wire, decoded) in self._totals.items()
+            }
+        summary["total"] = {
+            key: sum(entry[key] for entry in summary.values())
+            for key in ("requests", "wire_bytes", "decoded_bytes")
+        }
+        return summary
+    
+    def report(self) -> str:
+        """One-line summary of the bandwidth used and saved"""
+        summary = self.summary()
+        total = summary.pop("total")
+        if not total["decoded_bytes"]:
+            return f"Transferred {total['wire_bytes'] / 1e6:.2f} MB in {total['requests']} requests"
+        saved = 1 - total["wire_bytes"] / total["decoded_bytes"]
+        encodings = ", ".join(f"{encoding}: {entry['requests']}" for encoding, entry in sorted(summary.items()))
+        return (f"Transferred {total['wire_bytes'] / 1e6:.2f} MB for {total['decoded_bytes'] / 1e6:.2f} MB "
+                f"of pages in {total['requests']} requests ({saved:.0%} saved; {encodings})")
+
+# Supported values for TafsirExtractor(cache_mode=...)
+#   use:     serve pages from the raw cache, fetching only missing ones
+#   refresh: always fetch and overwrite the cached copy
+#   offline: never touch the network, only re-parse cached pages
+CACHE_MODES = ("use", "refresh", "offline")
+
+@dataclass
+class CachedPage:
+    """Metadata of a raw page stored in the RawResponseCache"""
+    url: str
+    sha256: str
+    size: int
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: str
+
+class RawResponseCache:
+    """Compressed, content-addressed on-disk cache of raw tafsir.app responses
+    
+    Layout under `root` (normally data/<author>/raw/):
+        objects/<sha[:2]>/<sha>.html.gz   gzip'd page bodies, deduplicated by SHA-256
+        <surah>/<ayah>.json               CachedPage metadata of the last fetch
+    
+    Files are written to a temporary name and renamed into place, so a crash
+    never leaves a half-written entry behind.
+    """
+    
+    def __init__(self, root):
+        self.root = Path(root)
+    
+    def _meta_path(self, surah: int, ayah: int) -> Path:
+        return self.root / str(surah) / f"{ayah}.json"
+    
+    def _object_path(self, sha256: str) -> Path:
+        return self.root / "objects" / sha256[:2] / f"{sha256}.html.gz"
+    
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def get(self, surah: int, ayah: int) -> Optional[CachedPage]:
+        """Return the metadata of a cached page, or None if it is not cached"""
+        try:
+            with open(self._meta_path(surah, ayah), 'r', encoding='utf-8') as f:
+                entry = CachedPage(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable cache entry for Surah {surah}, Ayah {ayah}: {e}")
+            return None
+        
+        if not self._object_path(entry.sha256).exists():
+            return None
+        return entry
+    
+    def read_content(self, entry: CachedPage) -> bytes:
+        """Return the raw body of a cached page"""
+        with gzip.open(self._object_path(entry.sha256), 'rb') as f:
+            return f.read()
+    
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedPage]) -> Optional[Dict[str, str]]:
+        """Build If-None-Match/If-Modified-Since headers from a cached page's validators"""
+        if not entry:
+            return None
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers or None
+    
+    def put(self, surah: int, ayah: int, response: requests.Response, content: bytes) -> CachedPage:
+        """Store a response body and the response's validators, returning the new metadata"""
+        sha256 = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(sha256)
+        if not object_path.exists():
+            self._write_atomic(object_path, gzip.compress(content))
+        
+        entry = CachedPage(
+            url=response.url,
+            sha256=sha256,
+            size=len(content),
+            # Pages are always parsed as UTF-8 bytes, whatever charset the headers claim
+            encoding='utf-8',
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            fetched_at=time.strftime("%Y-%m-%d %H:%M:%S")
+        )
+        self._write_atomic(
+            self._meta_path(surah, ayah),
+            json.dumps(asdict(entry), ensure_ascii=False, indent=2).encode('utf-8')
+        )
+        return entry
+
+class ProgressJournal:
+    """Append-only JSONL journal of completed and failed ayahs for one author
+    
+    Every completed ayah is written with its full record, so an interrupted
+    run can restore finished ayahs of a half-done surah without fetching them
+    again. Only line offsets are kept in memory; records are read back from
+    disk on demand. A torn last line from a crash is cut off when opened.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._completed: Dict[Tuple[int, int], int] = {}  # (surah, ayah) -> line offset
+        self._failed = set()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self._file = open(self.path, 'ab')
+    
+    def _load(self):
+        if not self.path.exists():
+            return
+        
+        offset = 0
+        with open(self.path, 'r+b') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Interrupted write: drop the partial line so appends start cleanly
+                    f.truncate(offset)
+                    break
+                try:
+                    event = json.loads(line)
+                    key = (event['surah'], event['ayah'])
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping corrupt line in {self.path}: {e}")
+                else:
+                    if event.get('event') == 'done':
+                        self._completed[key] = offset
+                        self._failed.discard(key)
+                    elif key not in self._completed:
+                        self._failed.add(key)
+                offset += len(line)
+    
+    def _append(self, event: dict) -> int:
+        line = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+        return offset
+    
+    def is_done(self, surah: int, ayah: int) -> bool:
+        return (surah, ayah) in self._completed
+    
+    def failed(self) -> List[Tuple[int, int]]:
+        """Ayahs whose last attempt failed"""
+        return sorted(self._failed)
+    
+    def completed_records(self, surah: int) -> List[TafsirContent]:
+        """Load the journaled records of a surah, sorted by ayah"""
+        offsets = sorted(offset for (s, _), offset in self._completed.items() if s == surah)
+        if not offsets:
+            return []
+        
+        records = []
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                records.append(TafsirContent(**json.loads(f.readline())['record']))
+        records.sort(key=lambda content: content.ayah_number)
+        return records
+    
+    def record_done(self, content: TafsirContent):
+        key = (content.surah_number, content.ayah_number)
+        self._completed[key] = self._append({
+            "event": "done", "surah": key[0], "ayah": key[1], "record": content_to_dict(content)
+        })
+        self._failed.discard(key)
+    
+    def record_failure(self, surah: int, ayah: int):
+        self._append({
+            "event": "failed", "surah": surah, "ayah": ayah,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+        })
+        self._failed.add((surah, ayah))
+    
+    def close(self):
+        self._file.close()
+
+def _open_compressed(path: Path, mode: str, compression: Optional[str]):
+    """Open a binary file, optionally through gzip or zstd"""
+    if compression is None:
+        return open(path, mode)
+    if compression == "gzip":
+        return gzip.open(path, mode)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package: pip install zstandard")
+        if 'r' in mode:
+            # Buffered so that the stream can be iterated line by line
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+            return io.BufferedReader(reader)
+        return zstandard.ZstdCompressor().stream_writer(open(path, mode))
+    raise ValueError(f"Unsupported compression: {compression}")
+
+def _compression_for(path: Path, compression: Optional[str]) -> Optional[str]:
+    """Use the given compression, or infer it from a .gz/.zst suffix"""
+    if compression is not None:
+        return compression
+    return {".gz": "gzip", ".zst": "zstd"}.get(path.suffix)
+
+class RecordSink(_Closeable, ABC):
+    """Base class of the outputs that TafsirContent records are streamed into
+    
+    Subclasses implement write() and close(); write_all() and use in a
+    with statement come for free.
+    """
+    
+    @abstractmethod
+    def write(self, content: TafsirContent):
+        """Write one record"""
+    
+    def write_all(self, contents: Iterable[TafsirContent]) -> int:
+        """Write every record of an iterable, returning how many were written"""
+        written = 0
+        for content in contents:
+            self.write(content)
+            written += 1
+        return written
+    
+    @abstractmethod
+    def close(self):
+        """Flush and release the output"""
+
+class JsonlSink(RecordSink):
+    """Stream TafsirContent records into a JSON Lines file, optionally gzip- or zstd-compressed"""
+    
+    def __init__(self, path, compression: Optional[str] = None, append: bool = True):
+        self.path = Path(path)
+        self.compression = _compression_for(self.path, compression)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open_compressed(self.path, 'ab' if append else 'wb', self.compression)
+        self._lock = threading.Lock()
+        self.count = 0
+    
+    def write(self, content: TafsirContent):
+        line = (json.dumps(content_to_dict(content), ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class ParquetSink(RecordSink):
+    """Write TafsirContent records to a columnar Parquet file with one row group per surah (requires pyarrow)"""
+    
+    def __init__(self, path, compression: str = "zstd"):
+        if pa is None:
+            raise ImportError("Parquet export requires the pyarrow package: pip install pyarrow")
+        
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.schema = pa.schema([
+            ("surah_number", pa.int16()),
+            ("surah_name_arabic", pa.dictionary(pa.int16(), pa.string())),
+            ("surah_name_english", pa.dictionary(pa.int16(), pa.string())),
+            ("ayah_number", pa.int16()),
+            ("tafsir_text", pa.large_string()),
+            ("tafsir_author", pa.dictionary(pa.int8(), pa.string())),
+            ("url", pa.string()),
+            ("extraction_timestamp", pa.string()),
+            ("tafsir_text_normalized", pa.large_string()),
+        ])
+        self._writer = pq.ParquetWriter(
+            str(self.path), self.schema, compression=compression,
+            use_dictionary=["surah_name_arabic", "surah_name_english", "tafsir_author"]
+        )
+        self._buffer: List[TafsirContent] = []
+        self._lock = threading.Lock()
+        self.count = 0
+    
+    def write(self, content: TafsirContent):
+        with self._lock:
+            if self._buffer and self._buffer[-1].surah_number != content.surah_number:
+                self._flush_locked()
+            self._buffer.append(content)
+            self.count += 1
+    
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        columns = {name: [getattr(content, name) for content in self._buffer] for name in self.schema.names}
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self._buffer = []
+    
+    def flush(self):
+        """Write the buffered records as a row group"""
+        with self._lock:
+            self._flush_locked()
+    
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._writer.close()
+
+def iter_jsonl(path, compression: Optional[str] = None) -> Iterator[TafsirContent]:
+    """Read back records written by JsonlSink one at a time"""
+    path = Path(path)
+    with _open_compressed(path, 'rb', _compression_for(path, compression)) as f:
+        for line in f:
+            if line.strip():
+                yield TafsirContent(**json.loads(line))
+
+# Translation tables for ArabicNormalizer, built once at import
+_DIACRITICS_TABLE = {
+    **{code: None for code in range(0x0610, 0x061B)},   # Quranic honorifics and small signs
+    **{code: None for code in range(0x064B, 0x0660)},   # Harakat, tanween, shadda, sukun
+    **{code: None for code in range(0x06D6, 0x06EE)},   # Quranic annotation marks
+    0x0670: None,                                       # Superscript alef
+}
+_TATWEEL_TABLE = {0x0640: None}
+_LETTER_VARIANTS_TABLE = str.maketrans({
+    'آ': 'ا', 'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي',
+    'ة': 'ه',
+})
+
+class ArabicNormalizer:
+    """Normalize Arabic text with a single precompiled str.translate pass
+    
+    Optionally canonicalizes Unicode first (NFC, or NFKC to also fold
+    presentation forms such as ligatures), then removes diacritics and
+    Quranic marks, collapses tatweel and folds alef, ya and ta marbuta
+    variants. The translation table is merged once per normalizer, so
+    calling it costs one normalization check and one translate pass.
+    """
+    
+    UNICODE_FORMS = ("NFC", "NFKC")
+    
+    def __init__(self, remove_diacritics: bool = True, normalize_letters: bool = True,
+                 remove_tatweel: bool = True, unicode_form: Optional[str] = "NFC"):
+        if unicode_form is not None and unicode_form not in self.UNICODE_FORMS:
+            raise ValueError(f"Invalid unicode form. Available options: {list(self.UNICODE_FORMS)}")
+        
+        self.unicode_form = unicode_form
+        mapping = {}
+        if remove_diacritics:
+            mapping.update(_DIACRITICS_TABLE)
+        if remove_tatweel:
+            mapping.update(_TATWEEL_TABLE)
+        if normalize_letters:
+            mapping.update(_LETTER_VARIANTS_TABLE)
+        
+        # A list indexed by code point translates much faster than a dict;
+        # characters past its end raise IndexError and are left unchanged
+        self._table = None
+        if mapping:
+            self._table = [chr(code) for code in range(max(mapping) + 1)]
+            for code, target in mapping.items():
+                self._table[code] = target
+    
+    def __call__(self, text: str) -> str:
+        if self.unicode_form and not unicodedata.is_normalized(self.unicode_form, text):
+            text = unicodedata.normalize(self.unicode_form, text)
+        return text.translate(self._table) if self._table is not None else text
+    
+    def apply(self, content: TafsirContent) -> TafsirContent:
+        """Return a copy of a record with tafsir_text_normalized filled in"""
+        return replace(content, tafsir_text_normalized=self(content.tafsir_text))
+
+# Folding applied to both indexed text and search queries
+_SEARCH_NORMALIZER = ArabicNormalizer()
+
+def normalize_for_search(text: str) -> str:
+    """Fold Arabic text for full-text indexing and querying"""
+    return _SEARCH_NORMALIZER(text)
+
+@dataclass
+class SearchHit:
+    """A ranked full-text search result; lower scores rank higher (bm25)"""
+    author: str
+    surah_number: int
+    ayah_number: int
+    score: float
+
+class SQLiteStore(RecordSink):
+    """SQLite storage for extracted tafsir keyed on (author, surah, ayah), with indexed point lookups"""
+    
+    _COLUMNS = ("author", "surah", "ayah", "surah_name_arabic", "surah_name_english",
+                "tafsir_text", "tafsir_author", "url", "extraction_timestamp", "tafsir_text_normalized")
+    
+    def __init__(self, path="data/tafsir.db", batch_size: int = 200):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+    
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS tafsir (
+                    id INTEGER PRIMARY KEY,
+                    author TEXT NOT NULL,
+                    surah INTEGER NOT NULL,
+                    ayah INTEGER NOT NULL,
+                    surah_name_arabic TEXT NOT NULL,
+                    surah_name_english TEXT NOT NULL,
+                    tafsir_text TEXT NOT NULL,
+                    tafsir_author TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    extraction_timestamp TEXT NOT NULL,
+                    tafsir_text_normalized TEXT,
+                    UNIQUE (author, surah, ayah)
+                )
+            """)
+            # Databases created before normalization was stored lack the column
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tafsir)")}
+            if "tafsir_text_normalized" not in columns:
+                self._conn.execute("ALTER TABLE tafsir ADD COLUMN tafsir_text_normalized TEXT")
+    
+    @staticmethod
+    def _author_key(author: str) -> str:
+        """Accept either an author slug or its display name"""
+        if author in AVAILABLE_AUTHORS:
+            return author
+        for key, name in AVAILABLE_AUTHORS.items():
+            if name == author:
+                return key
+        return author
+    
+    def write(self, content: TafsirContent):
+        """Queue a record for insertion, committing once a full batch is queued"""
+        row = (self._author_key(content.tafsir_author), content.surah_number, content.ayah_number,
+               content.surah_name_arabic, content.surah_name_english, content.tafsir_text,
+               content.tafsir_author, content.url, content.extraction_timestamp,
+               content.tafsir_text_normalized)
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+    
+    def write_all(self, contents: Iterable[TafsirContent]) -> int:
+        """Write every record of an iterable and commit them, returning how many were written"""
+        written = super().write_all(contents)
+        self.flush()
+        return written
+    
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        updates = ", ".join(f"{column} = excluded.{column}" for column in self._COLUMNS[3:])
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO tafsir ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))}) "
+                f"ON CONFLICT (author, surah, ayah) DO UPDATE SET {updates}",
+                self._pending
+            )
+        self._pending = []
+    
+    def flush(self):
+        """Commit all queued records"""
+        with self._lock:
+            self._flush_locked()
+    
+    def _to_content(self, row: tuple) -> TafsirContent:
+        _, surah, ayah, name_arabic, name_english, tafsir_text, tafsir_author, url, timestamp, normalized = row
+        return TafsirContent(
+            surah_number=surah,
+            surah_name_arabic=name_arabic,
+            surah_name_english=name_english,
+            ayah_number=ayah,
+            tafsir_text=tafsir_text,
+            tafsir_author=tafsir_author,
+            url=url,
+            extraction_timestamp=timestamp,
+            tafsir_text_normalized=normalized
+        )
+    
+    def get(self, author: str, surah: int, ayah: int) -> Optional[TafsirContent]:
+        """Look up a single ayah of an author"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM tafsir WHERE author = ? AND surah = ? AND ayah = ?",
+                (self._author_key(author), surah, ayah)
+            ).fetchone()
+        return self._to_content(row) if row else None
+    
+    def get_surah(self, author: str, surah: int) -> List[TafsirContent]:
+        """Look up all stored ayahs of a surah, in ayah order"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM tafsir WHERE author = ? AND surah = ? ORDER BY ayah",
+                (self._author_key(author), surah)
+            ).fetchall()
+        return [self._to_content(row) for row in rows]
+    
+    def build_search_index(self) -> int:
+        """(Re)build the FTS5 index over all stored tafsir_text
+        
+        Text is folded with normalize_for_search before indexing, so searches
+        ignore tashkeel and alef/ya/ta marbuta spelling variants. The index is
+        a snapshot: rebuild it after writing new records.
+        """
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.execute("DROP TABLE IF EXISTS tafsir_fts")
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE tafsir_fts USING fts5("
+                "tafsir_text, content='', tokenize='unicode61 remove_diacritics 2')"
+            )
+            rows = self._conn.execute("SELECT id, tafsir_text FROM tafsir")
+            self._conn.executemany(
+                "INSERT INTO tafsir_fts (rowid, tafsir_text) VALUES (?, ?)",
+                ((row_id, normalize_for_search(text)) for row_id, text in rows)
+            )
+            indexed = self._conn.execute("SELECT count(*) FROM tafsir").fetchone()[0]
+        logger.info(f"Indexed {indexed} records for full-text search")
+        return indexed
+    
+    def search(self, query: str, authors: Optional[Iterable[str]] = None,
+               surahs: Optional[Iterable[int]] = None, limit: int = 20) -> List[SearchHit]:
+        """Find ayahs whose tafsir contains every term of the query, best matches first
+        
+        A term ending in * matches as a prefix. Results can be restricted to
+        some authors (slugs or names) and surahs.
+        """
+        terms = []
+        for term in normalize_for_search(query).split():
+            prefix = term.endswith('*')
+            term = term.rstrip('*').replace('"', '""')
+            if term:
+                terms.append(f'"{term}"' + ('*' if prefix else ''))
+        if not terms:
+            return []
+        
+        sql = ("SELECT t.author, t.surah, t.ayah, bm25(tafsir_fts) AS score "
+               "FROM tafsir_fts JOIN tafsir t ON t.id = tafsir_fts.rowid WHERE tafsir_fts MATCH ?")
+        params: list = [' '.join(terms)]
+        if authors is not None:
+            keys = [self._author_key(author) for author in authors]
+            sql += f" AND t.author IN ({', '.join('?' * len(keys))})"
+            params.extend(keys)
+        if surahs is not None:
+            surahs = list(surahs)
+            sql += f" AND t.surah IN ({', '.join('?' * len(surahs))})"
+            params.extend(surahs)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                if "no such table" in str(e):
+                    raise RuntimeError("Search index missing, call build_search_index() first") from e
+                raise
+        return [SearchHit(*row) for row in rows]
+    
+    def import_json_dir(self, author: str, data_dir="data") -> int:
+        """Load the per-surah JSON files written by save_to_json for one author"""
+        imported = 0
+        for path in sorted(Path(data_dir, self._author_key(author)).glob("*.json"), key=lambda p: p.stem):
+            if not path.stem.isdigit():
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                imported += self.write_all(TafsirContent(**item) for item in json.load(f))
+        logger.info(f"Imported {imported} records for {author} into {self.path}")
+        return imported
+    
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+class TafsirCorpus(_Closeable):
+    """Memory-mapped reader for the packed binary corpus written by write_corpus"""
+    
+    # File layout (little-endian):
+    #   header  magic, format version (u16), surah count (u16), author slug (32 bytes, NUL padded),
+    #           ayah count (u32)
+    #   counts  ayahs per surah (u16 each), padded to 8 bytes
+    #   index   (start, length) pair of u64 per global ayah number; a zero length means the ayah is missing
+    #   blob    UTF-8 tafsir text, which lookups return as memoryview slices without copying
+    MAGIC = b"TAFSIRC1"
+    VERSION = 1
+    _HEADER = struct.Struct("<8sHH32sI")
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, surah_count, author, ayah_count = self._HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a version {self.VERSION} tafsir corpus")
+        
+        self.author = author.rstrip(b"\0").decode('ascii')
+        self.ayah_count = ayah_count
+        
+        counts_start = self._HEADER.size
+        counts = struct.unpack_from(f"<{surah_count}H", self._mmap, counts_start)
+        index_start = _align8(counts_start + 2 * surah_count)
+        self._blob_start = index_start + 16 * ayah_count
+        
+        # Global number of the first ayah of each surah (prefix sums of the counts)
+        self._surah_starts = [0] * (surah_count + 2)
+        for surah, count in enumerate(counts, start=1):
+            self._surah_starts[surah + 1] = self._surah_starts[surah] + count
+        
+        self._view = memoryview(self._mmap)
+        index = self._view[index_start:self._blob_start]
+        self._index = index.cast('Q') if sys.byteorder == 'little' else \
+            struct.unpack(f"<{2 * ayah_count}Q", index)
+    
+    def _global_index(self, surah: int, ayah: int) -> int:
+        """Zero-based position of an ayah in Mushaf order"""
+        if not 1 <= surah < len(self._surah_starts) - 1:
+            raise KeyError(f"Invalid surah number: {surah}")
+        start = self._surah_starts[surah]
+        if not 1 <= ayah <= self._surah_starts[surah + 1] - start:
+            raise KeyError(f"Invalid ayah number {ayah} for surah {surah}")
+        return start + ayah - 1
+    
+    def get(self, surah: int, ayah: int) -> Optional[memoryview]:
+        """Return the UTF-8 bytes of an ayah's tafsir without copying, or None if missing
+        
+        The view points into the mapping, so release it before closing the corpus.
+        """
+        position = self._global_index(surah, ayah)
+        start, length = self._index[2 * position], self._index[2 * position + 1]
+        if not length:
+            return None
+        return self._view[self._blob_start + start:self._blob_start + start + length]
+    
+    def get_text(self, surah: int, ayah: int) -> Optional[str]:
+        """Return an ayah's tafsir text, or None if missing"""
+        data = self.get(surah, ayah)
+        return str(data, 'utf-8') if data is not None else None
+    
+    def close(self):
+        if isinstance(self._index, memoryview):
+            self._index.release()
+        self._view.release()
+        self._mmap.close()
+
+def _align8(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def write_corpus(path, records: Iterable[TafsirContent], author: str) -> int:
+    """Pack records into the binary format read by TafsirCorpus
+    
+    Records may arrive in any order and are streamed straight to disk; only
+    the index is kept in memory. Returns the number of ayahs written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    counts = [SURAH_INFO[num].total_ayahs for num in sorted(SURAH_INFO)]
+    ayah_count = TOTAL_AYAHS
+    
+    index_start = _align8(TafsirCorpus._HEADER.size + 2 * len(counts))
+    blob_start = index_start + 16 * ayah_count
+    index = [0] * (2 * ayah_count)
+    
+    written = 0
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.seek(blob_start)
+        blob_size = 0
+        for content in records:
+            try:
+                position = global_index(content.surah_number, content.ayah_number) - 1
+            except ValueError as e:
+                logger.warning(f"Skipping record in corpus: {e}")
+                continue
+            data = content.tafsir_text.encode('utf-8')
+            index[2 * position], index[2 * position + 1] = blob_size, len(data)
+            f.write(data)
+            blob_size += len(data)
+            written += 1
+        
+        f.seek(0)
+        f.write(TafsirCorpus._HEADER.pack(TafsirCorpus.MAGIC, TafsirCorpus.VERSION, len(counts),
+                                          author.encode('ascii'), ayah_count))
+        f.write(struct.pack(f"<{len(counts)}H", *counts))
+        f.seek(index_start)
+        f.write(struct.pack(f"<{2 * ayah_count}Q", *index))
+    os.replace(tmp_path, path)
+    
+    logger.info(f"Packed {written} ayahs into {path}")
+    return written
+
 class TafsirExtractor:
     """Main class for extracting tafsir content from tafsir.app"""
     
-    def __init__(self, tafsir_author: str = "alrazi", delay: float = 1.0):
+    def __init__(self, tafsir_author: str = "alrazi", delay: float = 1.0,
+                 rate_limiter: Optional[RateLimiter] = None, workers: int = 1,
+                 parse_processes: int = 0, cache_mode: Optional[str] = None,
+                 resume: bool = False, session: Optional[requests.Session] = None,
+                 normalizer: Optional[ArabicNormalizer] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+                 hedger: Optional[RequestHedger] = None, stream: bool = False,
+                 transfer_stats: Optional[TransferStats] = None):
         # Available tafsir authors
-        self.available_authors = {
-            "alaloosi": "Al-Alusi",
-            "alrazi": "Al-Razi", 
-            "ibn-katheer": "Ibn Katheer",
-            "tabari": "At-Tabari",
-            "qurtubi": "Al-Qurtubi",
-            "ibn-aashoor": "Ibn Ashur",
-            "iraab-daas": "Iraab ul Quran"
-        }
+        self.available_authors = AVAILABLE_AUTHORS
         
         if tafsir_author not in self.available_authors:
             raise ValueError(f"Invalid tafsir author. Available options: {list(self.available_authors.keys())}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if parse_processes < 0:
+            raise ValueError("parse_processes cannot be negative")
+        if cache_mode is not None and cache_mode not in CACHE_MODES:
+            raise ValueError(f"Invalid cache mode. Available options: {list(CACHE_MODES)}")
+        if stream and (cache_mode or parse_processes):
+            raise ValueError("stream needs whole pages and cannot be combined with cache_mode or parse_processes")
         
         self.tafsir_author_key = tafsir_author
         self.tafsir_author_name = self.available_authors[tafsir_author]
         self.base_url = f"https://tafsir.app/{tafsir_author}"
         self.delay = delay  # Delay between requests to be respectful
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Pass a shared limiter to keep several extractors within one budget
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_delay(delay)
+        # Transient failures (timeouts, 429, 5xx) are retried; a breaker shared
+        # between extractors pauses every request to a host that keeps failing
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        # Optional adaptive cap on requests in flight per host, below the number of workers
+        self.concurrency = concurrency
+        # Optional duplicate requests for pages slower than the host's usual p95 latency
+        self.hedger = hedger
+        # With stream, pages are parsed while downloading and the connection is
+        # closed as soon as the tafsir text is complete (see _extract_streamed)
+        self.stream = stream
+        # Compressed versus decoded bytes of every fetched page
+        self.transfer_stats = transfer_stats if transfer_stats is not None else TransferStats()
+        # Number of ayahs fetched and parsed in parallel by extract_surah
+        self.workers = workers
+        
+        # A session passed in is shared with other extractors and not closed by this one.
+        # Otherwise keep one pooled connection per worker instead of reconnecting.
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session(pool_size=workers)
+        
+        # With parse_processes > 0, fetch threads only download and a process
+        # pool does the parsing (see _extract_ayahs_pipelined)
+        self.parse_processes = parse_processes
+        self._parse_pool = None
+        self._parse_pool_lock = threading.Lock()
+        
+        # Raw responses are cached under data/<author>/raw/ when a cache mode is set
+        self.cache_mode = cache_mode
+        self.cache = RawResponseCache(Path("data") / tafsir_author / "raw") if cache_mode else None
+        
+        # With resume, finished ayahs are journaled and skipped on the next run
+        self.journal = ProgressJournal(Path("data") / tafsir_author / "progress.jsonl") if resume else None
+        
+        # Optional normalization stage, stored in tafsir_text_normalized next to the raw text
+        self.normalizer = normalizer
         
         # Quran structure - 114 Surahs with their ayah counts
         self.surah_info = self._get_surah_info()
     
     def _get_surah_info(self) -> Dict[int, SurahInfo]:
         """Get information about all Surahs in the Quran"""
-        # This is the standard Quran structure with ayah counts
-        surah_data = [
-            (1, "الفاتحة", "Al-Fatihah", 7, "Makkah"),
-            (2, "البقرة", "Al-Baqarah", 286, "Madinah"),
-            (3, "آل عمران", "Aal-E-Imran", 200, "Madinah"),
-            (4, "النساء", "An-Nisa", 176, "Madinah"),
-            (5, "المائدة", "Al-Maidah", 120, "Madinah"),
-            (6, "الأنعام", "Al-An'am", 165, "Makkah"),
-            (7, "الأعراف", "Al-A'raf", 206, "Makkah"),
-            (8, "الأنفال", "Al-Anfal", 75, "Madinah"),
-            (9, "التوبة", "At-Tawbah", 129, "Madinah"),
-            (10, "يونس", "Yunus", 109, "Makkah"),
-            (11, "هود", "Hud", 123, "Makkah"),
-            (12, "يوسف", "Yusuf", 111, "Makkah"),
-            (13, "الرعد", "Ar-Ra'd", 43, "Madinah"),
-            (14, "إبراهيم", "Ibrahim", 52, "Makkah"),
-            (15, "الحجر", "Al-Hijr", 99, "Makkah"),
-            (16, "النحل", "An-Nahl", 128, "Makkah"),
-            (17, "الإسراء", "Al-Isra", 111, "Makkah"),
-            (18, "الكهف", "Al-Kahf", 110, "Makkah"),
-            (19, "مريم", "Maryam", 98, "Makkah"),
-            (20, "طه", "Taha", 135, "Makkah"),
-            (21, "الأنبياء", "Al-Anbiya", 112, "Makkah"),
-            (22, "الحج", "Al-Hajj", 78, "Madinah"),
-            (23, "المؤمنون", "Al-Mu'minun", 118, "Makkah"),
-            (24, "النور", "An-Nur", 64, "Madinah"),
-            (25, "الفرقان", "Al-Furqan", 77, "Makkah"),
-            (26, "الشعراء", "Ash-Shu'ara", 227, "Makkah"),
-            (27, "النمل", "An-Naml", 93, "Makkah"),
-            (28, "القصص", "Al-Qasas", 88, "Makkah"),
-            (29, "العنكبوت", "Al-Ankabut", 69, "Makkah"),
-            (30, "الروم", "Ar-Rum", 60, "Makkah"),
-            (31, "لقمان", "Luqman", 34, "Makkah"),
-            (32, "السجدة", "As-Sajdah", 30, "Makkah"),
-            (33, "الأحزاب", "Al-Ahzab", 73, "Madinah"),
-            (34, "سبأ", "Saba", 54, "Makkah"),
-            (35, "فاطر", "Fatir", 45, "Makkah"),
-            (36, "يس", "Ya-Sin", 83, "Makkah"),
-            (37, "الصافات", "As-Saffat", 182, "Makkah"),
-            (38, "ص", "Sad", 88, "Makkah"),
-            (39, "الزمر", "Az-Zumar", 75, "Makkah"),
-            (40, "غافر", "Ghafir", 85, "Makkah"),
-            (41, "فصلت", "Fussilat", 54, "Makkah"),
-            (42, "الشورى", "Ash-Shura", 53, "Makkah"),
-            (43, "الزخرف", "Az-Zukhruf", 89, "Makkah"),
-            (44, "الدخان", "Ad-Dukhan", 59, "Makkah"),
-            (45, "الجاثية", "Al-Jathiyah", 37, "Makkah"),
-            (46, "الأحقاف", "Al-Ahqaf", 35, "Makkah"),
-            (47, "محمد", "Muhammad", 38, "Madinah"),
-            (48, "الفتح", "Al-Fath", 29, "Madinah"),
-            (49, "الحجرات", "Al-Hujurat", 18, "Madinah"),
-            (50, "ق", "Qaf", 45, "Makkah"),
-            (51, "الذاريات", "Adh-Dhariyat", 60, "Makkah"),
-            (52, "الطور", "At-Tur", 49, "Makkah"),
-            (53, "النجم", "An-Najm", 62, "Makkah"),
-            (54, "القمر", "Al-Qamar", 55, "Makkah"),
-            (55, "الرحمن", "Ar-Rahman", 78, "Makkah"),
-            (56, "الواقعة", "Al-Waqiah", 96, "Makkah"),
-            (57, "الحديد", "Al-Hadid", 29, "Madinah"),
-            (58, "المجادلة", "Al-Mujadila", 22, "Madinah"),
-            (59, "الحشر", "Al-Hashr", 24, "Madinah"),
-            (60, "الممتحنة", "Al-Mumtahanah", 13, "Madinah"),
-            (61, "الصف", "As-Saff", 14, "Madinah"),
-            (62, "الجمعة", "Al-Jumu'ah", 11, "Madinah"),
-            (63, "المنافقون", "Al-Munafiqun", 11, "Madinah"),
-            (64, "التغابن", "At-Taghabun", 18, "Madinah"),
-            (65, "الطلاق", "At-Talaq", 12, "Madinah"),
-            (66, "التحريم", "At-Tahrim", 12, "Madinah"),
-            (67, "الملك", "Al-Mulk", 30, "Makkah"),
-            (68, "القلم", "Al-Qalam", 52, "Makkah"),
-            (69, "الحاقة", "Al-Haqqah", 52, "Makkah"),
-            (70, "المعارج", "Al-Ma'arij", 44, "Makkah"),
-            (71, "نوح", "Nuh", 28, "Makkah"),
-            (72, "الجن", "Al-Jinn", 28, "Makkah"),
-            (73, "المزمل", "Al-Muzzammil", 20, "Makkah"),
-            (74, "المدثر", "Al-Muddaththir", 56, "Makkah"),
-            (75, "القيامة", "Al-Qiyamah", 40, "Makkah"),
-            (76, "الإنسان", "Al-Insan", 31, "Madinah"),
-            (77, "المرسلات", "Al-Mursalat", 50, "Makkah"),
-            (78, "النبأ", "An-Naba", 40, "Makkah"),
-            (79, "النازعات", "An-Nazi'at", 46, "Makkah"),
-            (80, "عبس", "Abasa", 42, "Makkah"),
-            (81, "التكوير", "At-Takwir", 29, "Makkah"),
-            (82, "الانفطار", "Al-Infitar", 19, "Makkah"),
-            (83, "المطففين", "Al-Mutaffifin", 36, "Makkah"),
-            (84, "الانشقاق", "Al-Inshiqaq", 25, "Makkah"),
-            (85, "البروج", "Al-Buruj", 22, "Makkah"),
-            (86, "الطارق", "At-Tariq", 17, "Makkah"),
-            (87, "الأعلى", "Al-A'la", 19, "Makkah"),
-            (88, "الغاشية", "Al-Ghashiyah", 26, "Makkah"),
-            (89, "الفجر", "Al-Fajr", 30, "Makkah"),
-            (90, "البلد", "Al-Balad", 20, "Makkah"),
-            (91, "الشمس", "Ash-Shams", 15, "Makkah"),
-            (92, "الليل", "Al-Layl", 21, "Makkah"),
-            (93, "الضحى", "Ad-Duhaa", 11, "Makkah"),
-            (94, "الشرح", "Ash-Sharh", 8, "Makkah"),
-            (95, "التين", "At-Tin", 8, "Makkah"),
-            (96, "العلق", "Al-Alaq", 19, "Makkah"),
-            (97, "القدر", "Al-Qadr", 5, "Makkah"),
-            (98, "البينة", "Al-Bayyinah", 8, "Madinah"),
-            (99, "الزلزلة", "Az-Zalzalah", 8, "Madinah"),
-            (100, "العاديات", "Al-Adiyat", 11, "Makkah"),
-            (101, "القارعة", "Al-Qari'ah", 11, "Makkah"),
-            (102, "التكاثر", "At-Takathur", 8, "Makkah"),
-            (103, "العصر", "Al-Asr", 3, "Makkah"),
-            (104, "الهمزة", "Al-Humazah", 9, "Makkah"),
-            (105, "الفيل", "Al-Fil", 5, "Makkah"),
-            (106, "قريش", "Quraysh", 4, "Makkah"),
-            (107, "الماعون", "Al-Ma'un", 7, "Makkah"),
-            (108, "الكوثر", "Al-Kawthar", 3, "Makkah"),
-            (109, "الكافرون", "Al-Kafirun", 6, "Makkah"),
-            (110, "النصر", "An-Nasr", 3, "Madinah"),
-            (111, "المسد", "Al-Masad", 5, "Makkah"),
-            (112, "الإخلاص", "Al-Ikhlas", 4, "Makkah"),
-            (113, "الفلق", "Al-Falaq", 5, "Makkah"),
-            (114, "الناس", "An-Nas", 6, "Makkah")
-        ]
+        return SURAH_INFO
+    
+    def _make_request(self, url: str, headers: Optional[Dict[str, str]] = None,
+                      read=None) -> Optional[FetchResult]:
+        """Make HTTP request with rate limiting, concurrency control, hedging, retries and circuit breaking
         
-        return {
-            num: SurahInfo(num, ar_name, en_name, ayahs, place)
-            for num, ar_name, en_name, ayahs, place in surah_data
-        }
+        Returns None once the request has failed for good. See _send_request
+        for read; a body that fails halfway through is retried like any
+        other request.
+        """
+        max_attempts = self.retry_policy.max_attempts
+        for attempt in range(1, max_attempts + 1):
+            if self.circuit_breaker:
+                self.circuit_breaker.wait(url)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(url)
+            
+            result, error = None, None
+            try:
+                if self.hedger:
+                    # The duplicate needs its own rate limit token
+                    result = self.hedger.send(url, lambda: self._send_counted(url, headers, read),
+                                              self.rate_limiter.acquire if self.rate_limiter else None,
+                                              lambda result: self.retry_policy.is_retryable(result.response))
+                else:
+                    result = self._send_counted(url, headers, read)
+            except requests.exceptions.RequestException as e:
+                error = e
+            
+            response = result.response if result else None
+            retryable = self.retry_policy.is_retryable(response, error)
+            if self.circuit_breaker:
+                # Only failures that point at an overloaded or unreachable host count
+                if retryable:
+                    self.circuit_breaker.record_failure(url)
+                else:
+                    self.circuit_breaker.record_success(url)
+            
+            if error is None and response.ok:
+                return result
+            if response is not None:
+                response.close()
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            if not retryable or attempt == max_attempts:
+                break
+            
+            delay = self.retry_policy.delay(attempt, response)
+            logger.warning(f"Request failed for {url}: {reason}. Retrying in {delay:.1f}s "
+                           f"(attempt {attempt}/{max_attempts})")
+            time.sleep(delay)
+        
+        logger.error(f"Request failed for {url}: {reason}")
+        return None
     
-    def _make_request(self, url: str) -> Optional[requests.Response]:
-        """Make HTTP request with error handling and rate limiting"""
+    def _send_counted(self, url: str, headers: Optional[Dict[str, str]] = None,
+                      read=None) -> FetchResult:
+        """Send a single request and read its body while holding a slot of the concurrency limiter"""
+        if not self.concurrency:
+            return self._send_request(url, headers, read)
+        
+        self.concurrency.acquire(url)
+        result, error = None, None
+        started = time.monotonic()
         try:
-            time.sleep(self.delay)
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return response
+            result = self._send_request(url, headers, read)
+            return result
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {url}: {e}")
-            return None
+            error = e
+            raise
+        finally:
+            self.concurrency.release(url, time.monotonic() - started, result.response if result else None, error)
+    
+    def _send_request(self, url: str, headers: Optional[Dict[str, str]] = None,
+                      read=None) -> FetchResult:
+        """Send a single GET request without any rate limiting or retries
+        
+        The body is read and decoded here, recording its compressed and
+        decoded size. By default the result holds the body's bytes. For a
+        successful response, read(chunks) can consume the decoded chunks
+        instead, and its return value becomes the result's body. If it
+        stops before the end, the connection is closed instead of returned
+        to the pool.
+        """
+        response = self.session.get(url, headers=headers, timeout=30, stream=True)
+        body = _BodyReader(response)
+        try:
+            content = read(body) if read is not None and response.ok else b''.join(body)
+        finally:
+            self.transfer_stats.record(url, body.encoding, body.wire_bytes, body.decoded_bytes)
+            if not body.complete:
+                response.close()
+        return FetchResult(response, content)
     
-    def _parse_tafsir_content(self, html_content: str, surah: int, ayah: int) -> Optional[TafsirContent]:
+    def _parse_tafsir_content(self, html_content: bytes, surah: int, ayah: int) -> Optional[TafsirContent]:
         """Parse HTML content and extract tafsir information"""
         try:
-            soup = BeautifulSoup(html_content, 'lxml')
-            
-            # Extract Arabic text of the ayah
-            ayah_div = soup.find('div', id='preloaded-data')
-            ayah_text = ayah_div.get_text()
-            json_data = json.loads(ayah_text)
-            ayah_arabic = json_data.get('ayah')
-            
-            # Extract tafsir text
-            tafsir_div = soup.find('div', id='preloaded-text')
-            tafsir_text = tafsir_div.get_text(separator='\n')
-            lines = [line.strip() for line in tafsir_text.splitlines()]
-            tafsir_text = '\n'.join([line for line in lines if line])
-            
-            # Get surah information
-            surah_info = self.surah_info.get(surah)
-            if not surah_info:
-                logger.warning(f"Unknown surah number: {surah}")
-                return None
-            
-            # Create TafsirContent object
-            content = TafsirContent(
-                surah_number=surah,
-                surah_name_arabic=surah_info.name_arabic,
-                surah_name_english=surah_info.name_english,
-                ayah_number=ayah,
-                #ayah_text_arabic=ayah_arabic,
-                #ayah_text_transliteration=transliteration,
-                #ayah_text_translation=translation,
-                tafsir_text=tafsir_text,
-                tafsir_author=self.tafsir_author_name,
-                url=f"{self.base_url}/{surah}/{ayah}",
-                extraction_timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
-            )
-            
-            return content
-            
+            tafsir_text = parse_tafsir_text(html_content)
         except Exception as e:
             logger.error(f"Error parsing content for Surah {surah}, Ayah {ayah}: {e}")
             return None
+        
+        return self._build_content(surah, ayah, tafsir_text)
     
-    def extract_single_ayah(self, surah: int, ayah: int) -> Optional[TafsirContent]:
-        """Extract tafsir content for a single ayah"""
+    def _build_content(self, surah: int, ayah: int, tafsir_text: str) -> Optional[TafsirContent]:
+        """Wrap parsed tafsir text into a TafsirContent object"""
+        # Get surah information
+        surah_info = self.surah_info.get(surah)
+        if not surah_info:
+            logger.warning(f"Unknown surah number: {surah}")
+            return None
+        
+        # Create TafsirContent object
+        content = TafsirContent(
+            surah_number=surah,
+            surah_name_arabic=surah_info.name_arabic,
+            surah_name_english=surah_info.name_english,
+            ayah_number=ayah,
+            #ayah_text_arabic=ayah_arabic,
+            #ayah_text_transliteration=transliteration,
+            #ayah_text_translation=translation,
+            tafsir_text=tafsir_text,
+            tafsir_author=self.tafsir_author_name,
+            url=f"{self.base_url}/{surah}/{ayah}",
+            extraction_timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+            tafsir_text_normalized=self.normalizer(tafsir_text) if self.normalizer else None
+        )
+        
+        return content
+    
+    def _is_valid_ayah(self, surah: int, ayah: int) -> bool:
+        """Check that the surah/ayah pair exists, logging an error if not"""
         if surah not in self.surah_info:
             logger.error(f"Invalid surah number: {surah}")
-            return None
+            return False
         
         if ayah < 1 or ayah > self.surah_info[surah].total_ayahs:
             logger.error(f"Invalid ayah number {ayah} for surah {surah}")
+            return False
+        
+        return True
+    
+    def extract_single_ayah(self, surah: int, ayah: int) -> Optional[TafsirContent]:
+        """Extract tafsir content for a single ayah"""
+        if not self._is_valid_ayah(surah, ayah):
+            return None
+        
+        if self.stream:
+            return self._extract_streamed(surah, ayah)
+        
+        html_content = self._fetch_ayah(surah, ayah)
+        if html_content is None:
             return None
         
+        return self._parse_tafsir_content(html_content, surah, ayah)
+    
+    def _extract_streamed(self, surah: int, ayah: int) -> Optional[TafsirContent]:
+        """Parse an ayah's page while it downloads and stop once the tafsir text is complete
+        
+        Neither the whole page nor its unused tail is held in memory. Closing
+        the response early drops the connection instead of returning it to
+        the pool.
+        """
         url = f"{self.base_url}/{surah}/{ayah}"
         logger.info(f"Extracting: {url}")
         
-        response = self._make_request(url)
-        if not response:
+        def parse(chunks: Iterable[bytes]) -> Optional[str]:
+            # Parse errors are final; only errors reading the body are retried
+            try:
+                tafsir_text = stream_tafsir_text(chunks)
+            except (ValueError, etree.LxmlError) as e:
+                logger.error(f"Error parsing content for Surah {surah}, Ayah {ayah}: {e}")
+                return None
+            if tafsir_text is None:
+                logger.error(f"Error parsing content for Surah {surah}, Ayah {ayah}: preloaded divs not found")
+            return tafsir_text
+        
+        result = self._make_request(url, read=parse)
+        if result is None or result.body is None:
             return None
         
-        return self._parse_tafsir_content(response.text, surah, ayah)
+        return self._build_content(surah, ayah, result.body)
+    
+    def _fetch_ayah(self, surah: int, ayah: int) -> Optional[bytes]:
+        """Fetch the raw UTF-8 HTML of a single ayah, going through the raw cache if enabled
+        
+        The body is returned as bytes and parsed as UTF-8 directly. Going
+        through response.text would make requests sniff the charset of the
+        whole page whenever the Content-Type has no charset (and decode it
+        as Latin-1 for text/html).
+        """
+        url = f"{self.base_url}/{surah}/{ayah}"
+        entry = self.cache.get(surah, ayah) if self.cache else None
+        
+        if entry and self.cache_mode != "refresh":
+            try:
+                html_content = self.cache.read_content(entry)
+                logger.debug(f"Using cached page: {url}")
+                return html_content
+            except (OSError, EOFError) as e:
+                logger.warning(f"Failed to read cached page for {url}: {e}")
+                entry = None
+        
+        if self.cache_mode == "offline":
+            logger.warning(f"Page not cached and offline mode is set: {url}")
+            return None
+        
+        # In refresh mode, revalidate cached pages instead of downloading them again
+        logger.info(f"Extracting: {url}")
+        result = self._make_request(url, RawResponseCache.conditional_headers(entry))
+        if not result:
+            return None
+        
+        if result.response.status_code == 304 and entry:
+            logger.debug(f"Not modified, reusing cached page: {url}")
+            return self.cache.read_content(entry)
+        
+        if self.cache:
+            try:
+                self.cache.put(surah, ayah, result.response, result.body)
+            except OSError as e:
+                logger.error(f"Failed to cache page for {url}: {e}")
+        
+        return result.body
     
     def extract_surah(self, surah: int) -> List[TafsirContent]:
         """Extract tafsir content for an entire surah"""
+        return list(self.iter_surah(surah))
+    
+    def iter_surah(self, surah: int) -> Iterator[TafsirContent]:
+        """Yield tafsir content for a surah in ayah order as it is extracted
+        
+        Each ayah is yielded once it and all ayahs before it are done, so at
+        most the out-of-order results of one surah are held in memory.
+        """
         if surah not in self.surah_info:
             logger.error(f"Invalid surah number: {surah}")
-            return []
+            return
         
         surah_info = self.surah_info[surah]
         logger.info(f"Extracting Surah {surah}: {surah_info.name_english} ({surah_info.total_ayahs} ayahs)")
+        yield from self._iter_ayahs(surah, range(1, surah_info.total_ayahs + 1))
+    
+    def _iter_ayahs(self, surah: int, ayahs: Sequence[int]) -> Iterator[TafsirContent]:
+        """Yield the records of some ayahs of a surah in order as they are extracted"""
+        completed, pending = self.pending_ayahs(surah, ayahs)
+        if self.parse_processes > 0:
+            produced = self._extract_ayahs_pipelined(surah, pending)
+        elif self.workers > 1:
+            produced = self._extract_ayahs_threaded(surah, pending)
+        else:
+            produced = self._extract_ayahs_sequential(surah, pending)
         
-        results = []
-        for ayah in tqdm(range(1, surah_info.total_ayahs + 1), desc=f"Surah {surah}"):
-            content = self.extract_single_ayah(surah, ayah)
+        # Journaled records and fresh results are merged back into ayah order
+        ready: Dict[int, Optional[TafsirContent]] = {content.ayah_number: content for content in completed}
+        position = 0
+        for ayah, content in itertools.chain([(None, None)], produced):
+            if ayah is not None:
+                self.record_result(surah, ayah, content)
+                ready[ayah] = content
+            while position < len(ayahs) and ayahs[position] in ready:
+                content = ready.pop(ayahs[position])
+                if content:
+                    yield content
+                position += 1
+    
+    def pending_ayahs(self, surah: int, ayahs: Optional[Sequence[int]] = None
+                       ) -> Tuple[List[TafsirContent], List[int]]:
+        """Split ayahs of a surah (all by default) into journaled records and ayahs still to extract"""
+        if ayahs is None:
+            ayahs = range(1, self.surah_info[surah].total_ayahs + 1)
+        completed = self.journal.completed_records(surah) if self.journal else []
+        if len(ayahs) < self.surah_info[surah].total_ayahs:
+            wanted = set(ayahs)
+            completed = [content for content in completed if content.ayah_number in wanted]
+        done = {content.ayah_number for content in completed}
+        pending = [ayah for ayah in ayahs if ayah not in done]
+        if completed:
+            logger.info(f"Resuming Surah {surah}: {len(completed)} ayahs already extracted, {len(pending)} remaining")
+        return completed, pending
+    
+    def record_result(self, surah: int, ayah: int, content: Optional[TafsirContent]):
+        """Log a failed extraction and add the outcome to the progress journal"""
+        if not content:
+            logger.warning(f"Failed to extract Surah {surah}, Ayah {ayah}")
+        if self.journal:
             if content:
-                results.append(content)
+                self.journal.record_done(content)
             else:
-                logger.warning(f"Failed to extract Surah {surah}, Ayah {ayah}")
+                self.journal.record_failure(surah, ayah)
+    
+    def _extract_ayahs_sequential(self, surah: int, ayahs: Sequence[int]
+                                  ) -> Iterator[Tuple[int, Optional[TafsirContent]]]:
+        """Fetch and parse ayahs one after another"""
+        for ayah in tqdm(ayahs, desc=f"Surah {surah}"):
+            yield ayah, self.extract_single_ayah(surah, ayah)
+    
+    def _extract_ayahs_threaded(self, surah: int, ayahs: Sequence[int]
+                                ) -> Iterator[Tuple[int, Optional[TafsirContent]]]:
+        """Fetch and parse ayahs on a thread pool, yielding them as they complete"""
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tafsir-fetch")
+        try:
+            with tqdm(total=len(ayahs), desc=f"Surah {surah}") as progress:
+                futures = {executor.submit(self.extract_single_ayah, surah, ayah): ayah for ayah in ayahs}
+                for future in as_completed(futures):
+                    progress.update(1)
+                    yield futures[future], future.result()
+        finally:
+            # Drop queued ayahs if the consumer stops early
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _replace_parse_pool(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Start a new parse pool in place of a broken one, unless another thread already did"""
+        with self._parse_pool_lock:
+            if self._parse_pool is broken:
+                logger.warning("A parser process died, starting a new parse pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_processes)
+            return self._parse_pool
+    
+    def _submit_parse(self, html_content: bytes) -> Tuple[ProcessPoolExecutor, Future]:
+        """Submit a page to the parse pool, replacing the pool once if it is broken"""
+        pool = self._parse_pool
+        try:
+            return pool, pool.submit(parse_tafsir_text, html_content)
+        except BrokenProcessPool:
+            pool = self._replace_parse_pool(pool)
+            return pool, pool.submit(parse_tafsir_text, html_content)
+    
+    def _extract_ayahs_pipelined(self, surah: int, ayahs: Sequence[int]
+                                 ) -> Iterator[Tuple[int, Optional[TafsirContent]]]:
+        """Download ayahs on fetch threads and parse them on a process pool
+        
+        Fetchers push raw HTML into a bounded queue and a dispatcher thread
+        hands it to the parser processes. A parse slot is only freed once its
+        result has been consumed, so fetching, parsing and the consumer all
+        stay within a few pages per parser of each other. If a parser process
+        dies, the pool is replaced and the ayahs it was parsing are parsed
+        once more on the new pool.
+        """
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_processes)
+        
+        max_pending = self.parse_processes * 2
+        html_queue = queue.Queue(maxsize=max_pending)
+        parsed_queue = queue.Queue()
+        parse_slots = threading.Semaphore(max_pending)
+        closing = threading.Event()
+        
+        def fetch(ayah: int):
+            html_content = None
+            try:
+                if not closing.is_set():
+                    html_content = self._fetch_ayah(surah, ayah)
+            finally:
+                # Always report back so the dispatcher never waits forever
+                html_queue.put((ayah, html_content))
+        
+        def dispatch():
+            while True:
+                item = html_queue.get()
+                if item is None:
+                    return
+                ayah, html_content = item
+                if closing.is_set():
+                    continue  # Only drain the queue so fetchers can finish
+                if html_content is None:
+                    parsed_queue.put((ayah, None, None, None))
+                    continue
+                
+                parse_slots.acquire()
+                pool = None
+                try:
+                    pool, future = self._submit_parse(html_content)
+                except Exception as e:
+                    future = Future()
+                    future.set_exception(e)
+                future.add_done_callback(lambda done, ayah=ayah, html_content=html_content, pool=pool:
+                                         parsed_queue.put((ayah, html_content, pool, done)))
         
-        return results
+        fetchers = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tafsir-fetch")
+        try:
+            for ayah in ayahs:
+                fetchers.submit(fetch, ayah)
+            threading.Thread(target=dispatch, name="tafsir-dispatch", daemon=True).start()
+            
+            with tqdm(total=len(ayahs), desc=f"Surah {surah}") as progress:
+                for _ in ayahs:
+                    ayah, html_content, pool, future = parsed_queue.get()
+                    progress.update(1)
+                    if future is None:
+                        yield ayah, None
+                        continue
+                    
+                    parse_slots.release()
+                    try:
+                        try:
+                            tafsir_text = future.result()
+                        except BrokenProcessPool:
+                            if pool is None:
+                                raise
+                            logger.warning(f"Parser process died on Surah {surah}, Ayah {ayah}, parsing it again")
+                            tafsir_text = self._replace_parse_pool(pool).submit(parse_tafsir_text, html_content).result()
+                        content = self._build_content(surah, ayah, tafsir_text)
+                    except Exception as e:
+                        logger.error(f"Error parsing content for Surah {surah}, Ayah {ayah}: {e}")
+                        content = None
+                    yield ayah, content
+        finally:
+            # Unblock the dispatcher and fetchers if the consumer stopped early
+            closing.set()
+            for _ in range(max_pending):
+                parse_slots.release()
+            fetchers.shutdown(wait=True, cancel_futures=True)
+            html_queue.put(None)
+    
+    def check_for_updates(self, start_surah: int = 1, end_surah: int = 114) -> Dict[str, int]:
+        """Dry run of a refresh crawl: count how many cached ayahs changed upstream
+        
+        Sends a conditional request for every cached page in the range but
+        writes nothing. Ayahs that are not cached yet are only counted.
+        Needs the "use" or "refresh" cache mode, since "offline" never
+        touches the network.
+        """
+        if self.cache_mode not in ("use", "refresh"):
+            raise ValueError("check_for_updates requires cache_mode \"use\" or \"refresh\"")
+        
+        if start_surah not in SURAH_INFO or end_surah not in SURAH_INFO or start_surah > end_surah:
+            raise ValueError(f"Invalid surah range {start_surah}-{end_surah}")
+        ayahs = list(iter_ayahs(global_index(start_surah, 1),
+                                global_index(end_surah, SURAH_INFO[end_surah].total_ayahs)))
+        
+        def check(key: Tuple[int, int]) -> str:
+            surah, ayah = key
+            entry = self.cache.get(surah, ayah)
+            if not entry:
+                return "uncached"
+            result = self._make_request(f"{self.base_url}/{surah}/{ayah}",
+                                        RawResponseCache.conditional_headers(entry))
+            if result is None:
+                return "failed"
+            if result.response.status_code == 304 or hashlib.sha256(result.body).hexdigest() == entry.sha256:
+                return "unchanged"
+            return "changed"
+        
+        counts = {"changed": 0, "unchanged": 0, "uncached": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tafsir-fetch") as executor, \
+                tqdm(total=len(ayahs), desc="Checking") as progress:
+            for status in executor.map(check, ayahs):
+                counts[status] += 1
+                progress.update(1)
+        
+        logger.info(f"Update check for Surahs {start_surah}-{end_surah}: {counts['changed']} changed, "
+                    f"{counts['unchanged']} unchanged, {counts['uncached']} not cached, {counts['failed']} failed")
+        return counts
+    
+    def close(self):
+        """Release the parser processes, pooled connections and journal"""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True)
+            self._parse_pool = None
+        if self.journal:
+            self.journal.close()
+        if self._owns_session:
+            self.session.close()
 
     def extract_multiple_surah(self, start_surah: int, end_surah: int) -> List[TafsirContent]:
         """Extract tafsir content for the selected surah"""
@@ -349,12 +2301,86 @@ class TafsirExtractor:
         
         return all_results
     
+    def iter_range(self, start_surah: int, end_surah: int) -> Iterator[TafsirContent]:
+        """Yield tafsir content for a range of surahs as it is extracted
+        
+        Unlike extract_multiple_surah nothing is accumulated or saved, so
+        memory stays flat; pass the records to a sink such as JsonlSink instead.
+        """
+        for surah_num in tqdm(range(start_surah, end_surah + 1), desc="Surahs"):
+            yield from self.iter_surah(surah_num)
+    
+    def iter_all(self) -> Iterator[TafsirContent]:
+        """Yield tafsir content for the entire Quran as it is extracted"""
+        logger.info("Starting streaming extraction of entire Quran tafsir")
+        yield from self.iter_range(1, 114)
+    
+    def iter_span(self, start: int, end: int) -> Iterator[TafsirContent]:
+        """Yield tafsir content for an inclusive span of global ayah numbers (1..6236)"""
+        for surah, keys in itertools.groupby(iter_ayahs(start, end), key=lambda key: key[0]):
+            yield from self._iter_ayahs(surah, [ayah for _, ayah in keys])
+    
+    def _shard_path(self, shard_index: int, shard_count: int) -> Path:
+        return Path("data") / self.tafsir_author_key / "shards" / f"shard-{shard_index}-of-{shard_count}.jsonl"
+    
+    def _shard_span(self, shard_index: int, shard_count: int,
+                    plan: Optional[List[Tuple[int, int]]] = None) -> Tuple[int, int, Path]:
+        """Look up a shard's global ayah span and output file"""
+        plan = plan or plan_shards(shard_count)
+        if len(plan) != shard_count or not 1 <= shard_index <= shard_count:
+            raise ValueError(f"Invalid shard {shard_index}/{shard_count} for a plan of {len(plan)} shards")
+        
+        start, end = plan[shard_index - 1]
+        path = self._shard_path(shard_index, shard_count)
+        logger.info(f"Extracting shard {shard_index}/{shard_count}: "
+                    f"{from_global(start)} to {from_global(end)} ({end - start + 1} ayahs) into {path}")
+        return start, end, path
+    
+    def extract_shard(self, shard_index: int, shard_count: int,
+                      plan: Optional[List[Tuple[int, int]]] = None) -> Path:
+        """Extract one shard of the global ayah space into its own JSONL file
+        
+        `shard_index` runs from 1 to `shard_count`. Every node must use the
+        same plan (see plan_shards); without one the ayahs are split evenly.
+        """
+        start, end, path = self._shard_span(shard_index, shard_count, plan)
+        with JsonlSink(path, append=False) as sink:
+            sink.write_all(self.iter_span(start, end))
+        return path
+    
+    def merge_shards(self, shard_count: int) -> int:
+        """Merge the JSONL files of all shards into the per-surah JSON files
+        
+        Shards are contiguous spans, so reading them in shard order yields
+        the records in Mushaf order and the result does not depend on which
+        node finished first. Returns the number of records merged.
+        """
+        paths = [self._shard_path(index, shard_count) for index in range(1, shard_count + 1)]
+        missing = [str(path) for path in paths if not path.exists()]
+        if missing:
+            raise FileNotFoundError(f"Missing shard files: {missing}")
+        
+        merged = 0
+        records = itertools.chain.from_iterable(iter_jsonl(path) for path in paths)
+        for surah, contents in itertools.groupby(records, key=lambda content: content.surah_number):
+            # A retried shard may repeat ayahs; the last copy wins
+            by_ayah = {content.ayah_number: content for content in contents}
+            surah_results = [by_ayah[ayah] for ayah in sorted(by_ayah)]
+            self.save_to_json(surah_results, surah_numbers=[surah])
+            merged += len(surah_results)
+            if len(surah_results) < self.surah_info[surah].total_ayahs:
+                logger.warning(f"Surah {surah} is incomplete after merge: "
+                               f"{len(surah_results)}/{self.surah_info[surah].total_ayahs} ayahs")
+        
+        logger.info(f"Merged {merged} records from {shard_count} shards")
+        return merged
+    
     def _save_intermediate_results(self, data: List[TafsirContent], filename: str):
         """Save intermediate results to prevent data loss"""
         try:
             safe_filename = f"{filename}_{self.tafsir_author_key}.json"
             with open(safe_filename, 'w', encoding='utf-8') as f:
-                json.dump([asdict(item) for item in data], f, ensure_ascii=False, indent=2)
+                json.dump([content_to_dict(item) for item in data], f, ensure_ascii=False, indent=2)
             logger.info(f"Saved intermediate results: {safe_filename}")
         except Exception as e:
             logger.error(f"Failed to save intermediate results: {e}")
@@ -377,7 +2403,7 @@ class TafsirExtractor:
                 filename = f"{self.tafsir_author_key}_all.json"
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump([asdict(item) for item in data], f, ensure_ascii=False, indent=2)
+                json.dump([content_to_dict(item) for item in data], f, ensure_ascii=False, indent=2)
             logger.info(f"Data saved to {filename}")
             return filename
         except Exception as e:
@@ -401,16 +2427,881 @@ class TafsirExtractor:
                 # Default fallback
                 filename = f"{self.tafsir_author_key}_all.csv"
         try:
-            df = pd.DataFrame([asdict(item) for item in data])
+            df = pd.DataFrame([content_to_dict(item) for item in data])
             df.to_csv(filename, index=False, encoding='utf-8')
             logger.info(f"Data saved to {filename}")
             return filename
         except Exception as e:
             logger.error(f"Failed to save CSV: {e}")
             return None
+    
+    def save_to_corpus(self, data: Iterable[TafsirContent], filename: str = None):
+        """Pack extracted data into a memory-mappable corpus file (see TafsirCorpus)"""
+        if filename is None:
+            os.makedirs(f"data/{self.tafsir_author_key}", exist_ok=True)
+            filename = f"data/{self.tafsir_author_key}/{self.tafsir_author_key}.corpus"
+        try:
+            write_corpus(filename, data, self.tafsir_author_key)
+            return filename
+        except Exception as e:
+            logger.error(f"Failed to save corpus: {e}")
+            return None
+    
+    def save_to_parquet(self, data: List[TafsirContent], filename: str = None):
+        """Save extracted data to a compressed Parquet file, one row group per surah"""
+        if filename is None:
+            os.makedirs(f"data/{self.tafsir_author_key}", exist_ok=True)
+            filename = f"data/{self.tafsir_author_key}/{self.tafsir_author_key}.parquet"
+        try:
+            with ParquetSink(filename) as sink:
+                sink.write_all(sorted(data, key=lambda item: (item.surah_number, item.ayah_number)))
+            logger.info(f"Data saved to {filename}")
+            return filename
+        except Exception as e:
+            logger.error(f"Failed to save Parquet: {e}")
+            return None
+
+class AsyncTafsirExtractor(TafsirExtractor):
+    """Asyncio-based extractor that keeps several requests in flight under one global rate budget"""
+    
+    def __init__(self, tafsir_author: str = "alrazi", delay: float = 1.0, max_in_flight: int = 8,
+                 rate_limiter: Optional[RateLimiter] = None, cache_mode: Optional[str] = None,
+                 resume: bool = False, normalizer: Optional[ArabicNormalizer] = None,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+                 hedger: Optional[RequestHedger] = None, stream: bool = False,
+                 transfer_stats: Optional[TransferStats] = None):
+        super().__init__(tafsir_author=tafsir_author, delay=delay, rate_limiter=rate_limiter,
+                         cache_mode=cache_mode, resume=resume, normalizer=normalizer,
+                         retry_policy=retry_policy, circuit_breaker=circuit_breaker,
+                         concurrency=concurrency, hedger=hedger, stream=stream,
+                         transfer_stats=transfer_stats)
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        
+        self.max_in_flight = max_in_flight
+        # One pooled connection per in-flight request
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="tafsir-fetch")
+        
+        # The semaphore is bound to the running loop, so it is created lazily
+        self._loop = None
+        self._semaphore = None
+    
+    def _bind_loop(self):
+        """Create the in-flight semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return loop
+    
+    async def extract_single_ayah(self, surah: int, ayah: int) -> Optional[TafsirContent]:
+        """Extract tafsir content for a single ayah"""
+        if not self._is_valid_ayah(surah, ayah):
+            return None
+        
+        loop = self._bind_loop()
+        async with self._semaphore:
+            if self.stream:
+                return await loop.run_in_executor(self._executor, self._extract_streamed, surah, ayah)
+            html_content = await loop.run_in_executor(self._executor, self._fetch_ayah, surah, ayah)
+            if html_content is None:
+                return None
+            return await loop.run_in_executor(
+                self._executor, self._parse_tafsir_content, html_content, surah, ayah
+            )
+    
+    async def _extract_surah(self, surah: int, progress: tqdm) -> List[TafsirContent]:
+        """Extract all ayahs of a surah concurrently, advancing the given progress bar"""
+        results = []
+        
+        async def extract(ayah: int):
+            content = await self.extract_single_ayah(surah, ayah)
+            progress.update(1)
+            self.record_result(surah, ayah, content)
+            if content:
+                results.append(content)
+        
+        completed, ayahs = self.pending_ayahs(surah)
+        progress.update(len(completed))
+        await asyncio.gather(*(extract(ayah) for ayah in ayahs))
+        return sorted(completed + results, key=lambda content: content.ayah_number)
+    
+    async def extract_surah(self, surah: int) -> List[TafsirContent]:
+        """Extract tafsir content for an entire surah"""
+        if surah not in self.surah_info:
+            logger.error(f"Invalid surah number: {surah}")
+            return []
+        
+        surah_info = self.surah_info[surah]
+        logger.info(f"Extracting Surah {surah}: {surah_info.name_english} ({surah_info.total_ayahs} ayahs)")
+        
+        with tqdm(total=surah_info.total_ayahs, desc=f"Surah {surah}") as progress:
+            return await self._extract_surah(surah, progress)
+    
+    async def extract_multiple_surah(self, start_surah: int, end_surah: int) -> List[TafsirContent]:
+        """Extract tafsir content for the selected surah
+        
+        All ayahs of the range share the same in-flight limit, so there is no
+        stall at surah boundaries. Each surah is saved as soon as it completes.
+        """
+        logger.info("Starting extraction of selected surah")
+        surah_numbers = [num for num in range(start_surah, end_surah + 1) if num in self.surah_info]
+        total_ayahs = sum(self.surah_info[num].total_ayahs for num in surah_numbers)
+        loop = self._bind_loop()
+        
+        async def extract(surah_num: int) -> List[TafsirContent]:
+            surah_results = await self._extract_surah(surah_num, progress)
+            
+            # Save each surah individually
+            if surah_results:
+                await loop.run_in_executor(
+                    self._executor,
+                    lambda: self.save_to_json(surah_results, surah_numbers=[surah_num])
+                )
+            return surah_results
+        
+        with tqdm(total=total_ayahs, desc="Ayahs") as progress:
+            per_surah = await asyncio.gather(*(extract(num) for num in surah_numbers))
+        
+        return [content for surah_results in per_surah for content in surah_results]
+    
+    async def extract_all(self) -> List[TafsirContent]:
+        """Extract tafsir content for the entire Quran"""
+        logger.info("Starting extraction of entire Quran tafsir")
+        return await self.extract_multiple_surah(1, 114)
+    
+    async def iter_range(self, start_surah: int, end_surah: int) -> AsyncIterator[TafsirContent]:
+        """Yield tafsir content for a range of surahs in order as it is extracted
+        
+        Ayahs are scheduled ahead in a sliding window of twice the in-flight
+        limit, so requests keep flowing across surah boundaries while only
+        the window's results are held in memory.
+        """
+        surah_numbers = [num for num in range(start_surah, end_surah + 1) if num in self.surah_info]
+        async for content in self._iter_windowed(
+            (num, range(1, self.surah_info[num].total_ayahs + 1)) for num in surah_numbers
+        ):
+            yield content
+    
+    async def iter_span(self, start: int, end: int) -> AsyncIterator[TafsirContent]:
+        """Yield tafsir content for an inclusive span of global ayah numbers (1..6236)"""
+        spans = itertools.groupby(iter_ayahs(start, end), key=lambda key: key[0])
+        async for content in self._iter_windowed(
+            (surah, [ayah for _, ayah in keys]) for surah, keys in spans
+        ):
+            yield content
+    
+    async def _iter_windowed(self, surah_ayahs: Iterable[Tuple[int, Sequence[int]]]
+                             ) -> AsyncIterator[TafsirContent]:
+        """Yield the records of (surah, ayahs) groups in order through a sliding window of requests"""
+        loop = self._bind_loop()
+        window = collections.deque()
+        
+        async def extract(surah: int, ayah: int) -> Optional[TafsirContent]:
+            content = await self.extract_single_ayah(surah, ayah)
+            self.record_result(surah, ayah, content)
+            return content
+        
+        def schedule(surah: int, ayahs: Sequence[int]):
+            # Journaled records go into the window as already finished futures
+            completed, _ = self.pending_ayahs(surah, ayahs)
+            records = {content.ayah_number: content for content in completed}
+            for ayah in ayahs:
+                if ayah in records:
+                    future = loop.create_future()
+                    future.set_result(records[ayah])
+                    yield future
+                else:
+                    yield asyncio.ensure_future(extract(surah, ayah))
+        
+        try:
+            for surah, ayahs in surah_ayahs:
+                for future in schedule(surah, ayahs):
+                    window.append(future)
+                    while window and (window[0].done() or len(window) >= self.max_in_flight * 2):
+                        content = await window.popleft()
+                        if content:
+                            yield content
+            while window:
+                content = await window.popleft()
+                if content:
+                    yield content
+        finally:
+            # Stop outstanding requests if the consumer leaves early
+            for future in window:
+                future.cancel()
+    
+    async def iter_surah(self, surah: int) -> AsyncIterator[TafsirContent]:
+        """Yield tafsir content for a surah in ayah order as it is extracted"""
+        if surah not in self.surah_info:
+            logger.error(f"Invalid surah number: {surah}")
+            return
+        async for content in self.iter_range(surah, surah):
+            yield content
+    
+    async def iter_all(self) -> AsyncIterator[TafsirContent]:
+        """Yield tafsir content for the entire Quran as it is extracted"""
+        logger.info("Starting streaming extraction of entire Quran tafsir")
+        async for content in self.iter_range(1, 114):
+            yield content
+    
+    async def extract_shard(self, shard_index: int, shard_count: int,
+                            plan: Optional[List[Tuple[int, int]]] = None) -> Path:
+        """Extract one shard of the global ayah space into its own JSONL file"""
+        start, end, path = self._shard_span(shard_index, shard_count, plan)
+        with JsonlSink(path, append=False) as sink:
+            async for content in self.iter_span(start, end):
+                sink.write(content)
+        return path
+    
+    def close(self):
+        """Release the worker threads and pooled connections"""
+        self._executor.shutdown(wait=True)
+        super().close()
+
+class MultiAuthorCrawler(_Closeable):
+    """Crawl several tafsir authors in one process, round-robin under one shared rate budget"""
+    
+    def __init__(self, authors: Optional[List[str]] = None, delay: float = 1.0, workers: int = 4,
+                 rate_limiter: Optional[RateLimiter] = None, cache_mode: Optional[str] = None,
+                 resume: bool = True, normalizer: Optional[ArabicNormalizer] = None,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+                 hedger: Optional[RequestHedger] = None, stream: bool = False,
+                 transfer_stats: Optional[TransferStats] = None):
+        authors = list(authors) if authors else list(AVAILABLE_AUTHORS)
+        invalid = [author for author in authors if author not in AVAILABLE_AUTHORS]
+        if invalid:
+            raise ValueError(f"Invalid tafsir authors {invalid}. Available options: {list(AVAILABLE_AUTHORS.keys())}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        
+        self.workers = workers
+        self.session = create_session(pool_size=workers)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_delay(delay)
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.transfer_stats = transfer_stats if transfer_stats is not None else TransferStats()
+        self.extractors = {
+            author: TafsirExtractor(author, delay=delay, rate_limiter=self.rate_limiter,
+                                   cache_mode=cache_mode, resume=resume, session=self.session,
+                                   normalizer=normalizer, retry_policy=retry_policy,
+                                   circuit_breaker=self.circuit_breaker, concurrency=concurrency,
+                                   hedger=hedger, stream=stream, transfer_stats=self.transfer_stats)
+            for author in authors
+        }
+    
+    def crawl(self, start_surah: int = 1, end_surah: int = 114) -> Dict[str, int]:
+        """Crawl the surah range for every author, saving each surah as it completes
+        
+        Returns the number of records extracted per author.
+        """
+        surah_numbers = [num for num in range(start_surah, end_surah + 1) if num in SURAH_INFO]
+        logger.info(f"Crawling Surahs {start_surah}-{end_surah} for {len(self.extractors)} authors")
+        
+        counts = {author: 0 for author in self.extractors}
+        buffers: Dict[Tuple[str, int], List[TafsirContent]] = {}
+        remaining: Dict[Tuple[str, int], int] = {}
+        
+        def finish_surah(author: str, surah: int):
+            extractor = self.extractors[author]
+            results = sorted(buffers.pop((author, surah)), key=lambda content: content.ayah_number)
+            del remaining[(author, surah)]
+            counts[author] += len(results)
+            if results:
+                extractor.save_to_json(results, surah_numbers=[surah])
+        
+        def author_tasks(author: str) -> Iterator[Tuple[str, int, int]]:
+            extractor = self.extractors[author]
+            for surah in surah_numbers:
+                completed, ayahs = extractor.pending_ayahs(surah)
+                buffers[(author, surah)] = completed
+                remaining[(author, surah)] = len(ayahs)
+                progress.update(len(completed))
+                if not ayahs:
+                    finish_surah(author, surah)
+                for ayah in ayahs:
+                    yield author, surah, ayah
+        
+        def handle(future: Future):
+            author, surah, ayah = futures.pop(future)
+            content = future.result()
+            self.extractors[author].record_result(surah, ayah, content)
+            if content:
+                buffers[(author, surah)].append(content)
+            remaining[(author, surah)] -= 1
+            progress.update(1)
+            if remaining[(author, surah)] == 0:
+                finish_surah(author, surah)
+        
+        # Interleave the authors' task streams one ayah at a time
+        round_robin = (
+            task
+            for tasks in itertools.zip_longest(*(author_tasks(author) for author in self.extractors))
+            for task in tasks if task is not None
+        )
+        
+        total_ayahs = sum(SURAH_INFO[num].total_ayahs for num in surah_numbers) * len(self.extractors)
+        futures: Dict[Future, Tuple[str, int, int]] = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tafsir-fetch") as executor, \
+                tqdm(total=total_ayahs, desc="Ayahs") as progress:
+            for author, surah, ayah in round_robin:
+                # Keep a bounded number of tasks queued so scheduling stays fair
+                while len(futures) >= self.workers * 2:
+                    done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        handle(future)
+                future = executor.submit(self.extractors[author].extract_single_ayah, surah, ayah)
+                futures[future] = (author, surah, ayah)
+            
+            while futures:
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle(future)
+        
+        for author, count in counts.items():
+            logger.info(f"{self.extractors[author].tafsir_author_name}: {count} ayahs extracted")
+        logger.info(self.transfer_stats.report())
+        return counts
+    
+    def close(self):
+        """Release the extractors and the shared session"""
+        for extractor in self.extractors.values():
+            extractor.close()
+        self.session.close()
+
+@dataclass
+class QueueTask:
+    """An (author, surah, ayah) task leased from a WorkQueue"""
+    author: str
+    surah: int
+    ayah: int
+    attempts: int
+
+TASK_STATES = ("pending", "leased", "done", "dead")
+
+class WorkQueue(_Closeable):
+    """SQLite-backed queue of (author, surah, ayah) tasks with leases, retries and dead-lettering"""
+    
+    def __init__(self, path="data/queue.db", lease_seconds: float = 300.0,
+                 max_attempts: int = 3, retry_delay: float = 30.0):
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be positive")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        # Transactions are managed explicitly so leases can take the write lock up front
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                author TEXT NOT NULL,
+                surah INTEGER NOT NULL,
+                ayah INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL DEFAULT 0,
+                lease_expires REAL,
+                worker TEXT,
+                last_error TEXT,
+                PRIMARY KEY (author, surah, ayah)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, surah, ayah)")
+    
+    def _immediate(self, work):
+        """Run work(conn) in a transaction that holds the write lock from the start"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+    
+    def enqueue(self, authors: Iterable[str], start_surah: int = 1, end_surah: int = 114) -> int:
+        """Add a task for every ayah of the surah range, returning how many were new
+        
+        Tasks that are already queued keep their state, so a crawl can be
+        submitted again after adding authors or surahs.
+        """
+        authors = list(authors)
+        invalid = [author for author in authors if author not in AVAILABLE_AUTHORS]
+        if invalid:
+            raise ValueError(f"Invalid tafsir authors {invalid}. Available options: {list(AVAILABLE_AUTHORS.keys())}")
+        if start_surah not in SURAH_INFO or end_surah not in SURAH_INFO or start_surah > end_surah:
+            raise ValueError(f"Invalid surah range {start_surah}-{end_surah}")
+        
+        start = global_index(start_surah, 1)
+        end = global_index(end_surah, SURAH_INFO[end_surah].total_ayahs)
+        rows = [(author, surah, ayah) for surah, ayah in iter_ayahs(start, end) for author in authors]
+        
+        def insert(conn: sqlite3.Connection) -> int:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO tasks (author, surah, ayah) VALUES (?, ?, ?)", rows)
+            return conn.total_changes - before
+        
+        added = self._immediate(insert)
+        logger.info(f"Queued {added} new tasks for {len(authors)} authors, Surahs {start_surah}-{end_surah}")
+        return added
+    
+    def lease(self, worker_id: str, limit: int = 1,
+              authors: Optional[Iterable[str]] = None) -> List[QueueTask]:
+        """Lease up to limit available tasks to a worker"""
+        authors = list(authors) if authors else None
+        now = time.time()
+        
+        def take(conn: sqlite3.Connection) -> List[QueueTask]:
+            # An expired lease counts as a failed attempt of the worker that held it
+            conn.execute(
+                "UPDATE tasks SET state = 'dead', worker = NULL, lease_expires = NULL, "
+                "last_error = 'lease expired' WHERE state = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            query = ("SELECT author, surah, ayah, attempts FROM tasks "
+                     "WHERE ((state = 'pending' AND available_at <= ?) OR (state = 'leased' AND lease_expires <= ?))")
+            params: list = [now, now]
+            if authors:
+                query += f" AND author IN ({', '.join('?' * len(authors))})"
+                params.extend(authors)
+            query += " ORDER BY surah, ayah, author LIMIT ?"
+            params.append(limit)
+            rows = conn.execute(query, params).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET state = 'leased', attempts = attempts + 1, worker = ?, lease_expires = ? "
+                "WHERE author = ? AND surah = ? AND ayah = ?",
+                [(worker_id, now + self.lease_seconds, author, surah, ayah) for author, surah, ayah, _ in rows]
+            )
+            return [QueueTask(author, surah, ayah, attempts + 1) for author, surah, ayah, attempts in rows]
+        
+        return self._immediate(take)
+    
+    def complete(self, task: QueueTask, worker_id: str):
+        """Mark a task as done
+        
+        This is accepted even if the lease has meanwhile moved to another
+        worker, since the result is already stored.
+        """
+        self._immediate(lambda conn: conn.execute(
+            "UPDATE tasks SET state = 'done', worker = ?, lease_expires = NULL, last_error = NULL "
+            "WHERE author = ? AND surah = ? AND ayah = ?",
+            (worker_id, task.author, task.surah, task.ayah)
+        ))
+    
+    def fail(self, task: QueueTask, worker_id: str, error: str) -> str:
+        """Record a failed attempt, returning the task's new state
+        
+        The task is retried after retry_delay * 2 ** (attempts - 1) seconds,
+        or moved to "dead" once it has used up max_attempts.
+        """
+        def record(conn: sqlite3.Connection) -> str:
+            row = conn.execute(
+                "SELECT state, attempts, worker FROM tasks WHERE author = ? AND surah = ? AND ayah = ?",
+                (task.author, task.surah, task.ayah)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown task {task.author} {task.surah}:{task.ayah}")
+            state, attempts, worker = row
+            if state != "leased" or worker != worker_id:
+                # The lease expired and the task has moved on without us
+                return state
+            if attempts >= self.max_attempts:
+                state, available_at = "dead", 0
+            else:
+                state, available_at = "pending", time.time() + self.retry_delay * 2 ** (attempts - 1)
+            conn.execute(
+                "UPDATE tasks SET state = ?, available_at = ?, worker = NULL, lease_expires = NULL, last_error = ? "
+                "WHERE author = ? AND surah = ? AND ayah = ?",
+                (state, available_at, error, task.author, task.surah, task.ayah)
+            )
+            return state
+        
+        return self._immediate(record)
+    
+    def requeue_dead(self, authors: Optional[Iterable[str]] = None) -> int:
+        """Give dead tasks a fresh set of attempts, returning how many were requeued"""
+        authors = list(authors) if authors else None
+        
+        def requeue(conn: sqlite3.Connection) -> int:
+            query = ("UPDATE tasks SET state = 'pending', attempts = 0, available_at = 0, last_error = NULL "
+                     "WHERE state = 'dead'")
+            params: list = []
+            if authors:
+                query += f" AND author IN ({', '.join('?' * len(authors))})"
+                params.extend(authors)
+            return conn.execute(query, params).rowcount
+        
+        return self._immediate(requeue)
+    
+    def stats(self, authors: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Count the tasks in each state"""
+        authors = list(authors) if authors else None
+        query = "SELECT state, COUNT(*) FROM tasks"
+        params: list = []
+        if authors:
+            query += f" WHERE author IN ({', '.join('?' * len(authors))})"
+            params.extend(authors)
+        counts = {state: 0 for state in TASK_STATES}
+        with self._lock:
+            for state, count in self._conn.execute(query + " GROUP BY state", params):
+                counts[state] = count
+        return counts
+    
+    def is_drained(self, authors: Optional[Iterable[str]] = None) -> bool:
+        """Whether every task is either done or dead"""
+        counts = self.stats(authors)
+        return counts["pending"] == 0 and counts["leased"] == 0
+    
+    def dead_letters(self) -> List[Tuple[str, int, int, Optional[str]]]:
+        """List (author, surah, ayah, last error) of tasks that used up their attempts"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT author, surah, ayah, last_error FROM tasks WHERE state = 'dead' ORDER BY author, surah, ayah"
+            ).fetchall()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class QueueWorker(_Closeable):
+    """Pull ayah tasks from a WorkQueue and write the results to a store"""
+    
+    def __init__(self, work_queue: WorkQueue, store, delay: float = 1.0, worker_id: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None, cache_mode: Optional[str] = None,
+                 normalizer: Optional[ArabicNormalizer] = None, batch_size: int = 1,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 workers: int = 1, concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+                 hedger: Optional[RequestHedger] = None, stream: bool = False):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if stream and cache_mode:
+            raise ValueError("stream needs whole pages and cannot be combined with cache_mode")
+        
+        self.work_queue = work_queue
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.workers = workers
+        self.delay = delay
+        self.cache_mode = cache_mode
+        self.normalizer = normalizer
+        self.session = create_session(pool_size=workers)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_delay(delay)
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.concurrency = concurrency
+        self.hedger = hedger
+        self.stream = stream
+        self.transfer_stats = TransferStats()
+        self.extractors: Dict[str, TafsirExtractor] = {}
+        self._extractors_lock = threading.Lock()
+    
+    def _extractor(self, author: str) -> TafsirExtractor:
+        with self._extractors_lock:
+            if author not in self.extractors:
+                self.extractors[author] = TafsirExtractor(
+                    author, delay=self.delay, rate_limiter=self.rate_limiter, cache_mode=self.cache_mode,
+                    session=self.session, normalizer=self.normalizer, retry_policy=self.retry_policy,
+                    circuit_breaker=self.circuit_breaker, concurrency=self.concurrency, hedger=self.hedger,
+                    stream=self.stream, transfer_stats=self.transfer_stats
+                )
+            return self.extractors[author]
+    
+    def _process(self, task: QueueTask) -> bool:
+        try:
+            content = self._extractor(task.author).extract_single_ayah(task.surah, task.ayah)
+            error = "extraction failed"
+        except Exception as e:
+            content, error = None, str(e)
+        
+        if content is None:
+            state = self.work_queue.fail(task, self.worker_id, error)
+            if state == "dead":
+                logger.warning(f"Giving up on {task.author} Surah {task.surah}, Ayah {task.ayah} "
+                               f"after {task.attempts} attempts: {error}")
+            return False
+        
+        self.store.write(content)
+        self.store.flush()
+        self.work_queue.complete(task, self.worker_id)
+        return True
+    
+    def run(self, authors: Optional[Iterable[str]] = None, max_tasks: Optional[int] = None,
+            idle_wait: float = 5.0) -> Dict[str, int]:
+        """Process tasks until none are left, returning counts of done and failed tasks
+        
+        While the remaining tasks are leased by other workers or waiting
+        for a retry, the worker polls every idle_wait seconds, so it can
+        pick up tasks whose lease expires.
+        """
+        authors = list(authors) if authors else None
+        counts = {"done": 0, "failed": 0}
+        logger.info(f"Worker {self.worker_id} started")
+        
+        leased = collections.deque()   # Leased tasks waiting for a free thread
+        running: Dict[Future, QueueTask] = {}
+        started = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tafsir-fetch") as executor:
+            while True:
+                while len(running) < self.workers and (max_tasks is None or started < max_tasks):
+                    if not leased:
+                        limit = self.batch_size
+                        if max_tasks is not None:
+                            limit = min(limit, max_tasks - started)
+                        leased.extend(self.work_queue.lease(self.worker_id, limit, authors))
+                        if not leased:
+                            break
+                    task = leased.popleft()
+                    running[executor.submit(self._process, task)] = task
+                    started += 1
+                
+                if not running:
+                    if (max_tasks is not None and started >= max_tasks) or self.work_queue.is_drained(authors):
+                        break
+                    time.sleep(idle_wait)
+                    continue
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    counts["done" if future.result() else "failed"] += 1
+        
+        logger.info(f"Worker {self.worker_id} finished: {counts['done']} done, {counts['failed']} failed")
+        logger.info(self.transfer_stats.report())
+        return counts
+    
+    def close(self):
+        """Release the extractors and the session"""
+        for extractor in self.extractors.values():
+            extractor.close()
+        self.session.close()
+
+class CrawlCoordinator:
+    """Submit a crawl to a WorkQueue, track its completion and export the results"""
+    
+    def __init__(self, work_queue: WorkQueue, store: SQLiteStore):
+        self.work_queue = work_queue
+        self.store = store
+        self.authors: List[str] = []
+    
+    def submit(self, authors: Optional[Iterable[str]] = None, start_surah: int = 1, end_surah: int = 114) -> int:
+        """Queue every ayah of the surah range for the authors (by default all)"""
+        authors = list(authors) if authors else list(AVAILABLE_AUTHORS)
+        added = self.work_queue.enqueue(authors, start_surah, end_surah)
+        self.authors.extend(author for author in authors if author not in self.authors)
+        return added
+    
+    def wait(self, poll_interval: float = 10.0) -> Dict[str, int]:
+        """Block until every submitted task is done or dead, returning the final counts"""
+        counts = self.work_queue.stats(self.authors)
+        with tqdm(total=sum(counts.values()), desc="Tasks") as progress:
+            while True:
+                counts = self.work_queue.stats(self.authors)
+                progress.n = counts["done"] + counts["dead"]
+                progress.set_postfix(leased=counts["leased"], dead=counts["dead"])
+                progress.refresh()
+                if counts["pending"] == 0 and counts["leased"] == 0:
+                    break
+                time.sleep(poll_interval)
+        
+        if counts["dead"]:
+            logger.warning(f"{counts['dead']} tasks failed permanently; see WorkQueue.dead_letters()")
+        return counts
+    
+    def export(self, start_surah: int = 1, end_surah: int = 114) -> Dict[str, int]:
+        """Save the stored records of each author as per-surah JSON files
+        
+        Returns the number of records exported per author.
+        """
+        counts = {}
+        for author in self.authors or list(AVAILABLE_AUTHORS):
+            extractor = TafsirExtractor(author)
+            try:
+                counts[author] = 0
+                for surah in range(start_surah, end_surah + 1):
+                    records = self.store.get_surah(author, surah)
+                    if not records:
+                        continue
+                    if len(records) < SURAH_INFO[surah].total_ayahs:
+                        logger.warning(f"{extractor.tafsir_author_name} Surah {surah} is incomplete: "
+                                       f"{len(records)}/{SURAH_INFO[surah].total_ayahs} ayahs")
+                    extractor.save_to_json(records, surah_numbers=[surah])
+                    counts[author] += len(records)
+            finally:
+                extractor.close()
+        return counts
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the non-interactive command line options"""
+    parser = argparse.ArgumentParser(description="Extract tafsir content from tafsir.app. "
+                                                 "Without options an interactive prompt is shown.")
+    parser.add_argument("--author", default="alrazi", choices=list(AVAILABLE_AUTHORS) + ["all"],
+                        help="tafsir author to extract (default: alrazi); \"all\" only applies to --queue")
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds between requests (default: 1.0)")
+    parser.add_argument("--workers", type=int, default=1, help="ayahs fetched in parallel (default: 1)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="adapt the number of requests in flight (up to --workers) to the server's latency and errors")
+    parser.add_argument("--hedge", action="store_true",
+                        help="send a duplicate of requests slower than the recent p95 latency")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse pages while downloading and stop once the tafsir text is complete")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, help="use the raw response cache")
+    parser.add_argument("--resume", action="store_true", help="skip ayahs recorded in the progress journal")
+    parser.add_argument("--shard", metavar="I/N", help="extract shard I of N of the global ayah space")
+    parser.add_argument("--plan", metavar="PATH", help="shard plan file shared by all nodes")
+    parser.add_argument("--plan-shards", type=int, metavar="N",
+                        help="write a plan of N shards weighted by cached page sizes to --plan")
+    parser.add_argument("--merge-shards", type=int, metavar="N",
+                        help="merge the output of N shards into per-surah JSON files")
+    parser.add_argument("--queue", metavar="PATH", help="work queue database for distributed crawling")
+    parser.add_argument("--store", metavar="PATH", default="data/tafsir.db",
+                        help="SQLite database that queue workers write to (default: data/tafsir.db)")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="queue every ayah of --start-surah to --end-surah for --author")
+    parser.add_argument("--work", action="store_true", help="run a worker until the queue is drained")
+    parser.add_argument("--status", action="store_true", help="show task counts and dead letters")
+    parser.add_argument("--export", action="store_true", help="write per-surah JSON files from --store")
+    parser.add_argument("--start-surah", type=int, default=1)
+    parser.add_argument("--end-surah", type=int, default=114)
+    args = parser.parse_args(argv)
+    
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.stream and args.cache_mode:
+        parser.error("--stream cannot be combined with --cache-mode")
+    if args.queue and args.resume:
+        parser.error("--resume does not apply to --queue, the queue itself records finished tasks")
+    for option, count in (("--plan-shards", args.plan_shards), ("--merge-shards", args.merge_shards)):
+        if count is not None and not 1 <= count <= TOTAL_AYAHS:
+            parser.error(f"{option} must be between 1 and {TOTAL_AYAHS}")
+    
+    args.shard_plan = None
+    if args.shard:
+        try:
+            shard_index, shard_count = (int(part) for part in args.shard.split("/"))
+        except ValueError:
+            parser.error(f"invalid --shard {args.shard!r}, expected I/N such as 2/8")
+        if not 1 <= shard_index <= shard_count <= TOTAL_AYAHS:
+            parser.error(f"invalid --shard {args.shard!r}, I/N needs 1 <= I <= N <= {TOTAL_AYAHS}")
+        args.shard = (shard_index, shard_count)
+        if args.plan:
+            try:
+                args.shard_plan = load_shard_plan(args.plan)
+            except (OSError, ValueError, TypeError) as e:
+                parser.error(f"cannot read --plan {args.plan}: {e}")
+            if len(args.shard_plan) != shard_count:
+                parser.error(f"--plan {args.plan} has {len(args.shard_plan)} shards, but --shard asks for {shard_count}")
+    
+    if args.queue:
+        if not (args.enqueue or args.work or args.status or args.export):
+            parser.error("--queue needs at least one of --enqueue, --work, --status or --export")
+    elif not (args.shard or args.merge_shards or args.plan_shards):
+        parser.error("choose a command: --shard, --merge-shards, --plan-shards or --queue "
+                     "(run without options for the interactive prompt)")
+    return args
+
+def _concurrency_from_args(args: argparse.Namespace) -> Optional[AdaptiveConcurrencyLimiter]:
+    """The adaptive limiter selected by --adaptive, capped at --workers"""
+    if not args.adaptive:
+        return None
+    # Start below the default initial limit when only one worker is allowed
+    return AdaptiveConcurrencyLimiter(initial_limit=min(2, args.workers), max_limit=args.workers)
+
+def _print_fetch_stats(transfer_stats: TransferStats, concurrency: Optional[AdaptiveConcurrencyLimiter],
+                       hedger: Optional[RequestHedger]):
+    print(transfer_stats.report())
+    if concurrency:
+        print(f"Concurrency: {concurrency.stats('https://tafsir.app')}")
+    if hedger:
+        print(f"Hedged {hedger.hedged} requests, {hedger.hedge_wins} answered by the duplicate")
+
+def run_queue_cli(args: argparse.Namespace):
+    """Run the work queue commands selected on the command line"""
+    authors = list(AVAILABLE_AUTHORS) if args.author == "all" else [args.author]
+    with WorkQueue(args.queue) as work_queue, SQLiteStore(args.store) as store:
+        coordinator = CrawlCoordinator(work_queue, store)
+        if args.enqueue:
+            added = coordinator.submit(authors, args.start_surah, args.end_surah)
+            print(f"Queued {added} new tasks")
+        if args.work:
+            concurrency = _concurrency_from_args(args)
+            hedger = RequestHedger() if args.hedge else None
+            worker = QueueWorker(work_queue, store, delay=args.delay, cache_mode=args.cache_mode,
+                                 workers=args.workers, concurrency=concurrency, hedger=hedger,
+                                 stream=args.stream)
+            try:
+                counts = worker.run(authors)
+            finally:
+                worker.close()
+                if hedger:
+                    hedger.close()
+            print(f"Worker {worker.worker_id}: {counts['done']} done, {counts['failed']} failed")
+            _print_fetch_stats(worker.transfer_stats, concurrency, hedger)
+        if args.status:
+            print(work_queue.stats(authors))
+            for author, surah, ayah, error in work_queue.dead_letters():
+                print(f"  dead: {author} {surah}:{ayah} ({error})")
+        if args.export:
+            coordinator.authors = authors
+            counts = coordinator.export(args.start_surah, args.end_surah)
+            print(f"Exported {sum(counts.values())} records")
+
+def run_cli(args: argparse.Namespace):
+    """Run the sharding and queue commands selected on the command line"""
+    if args.queue:
+        run_queue_cli(args)
+        return
+    if args.author == "all":
+        raise SystemExit("--author all is only supported with --queue")
+    
+    if args.plan_shards:
+        if not args.plan:
+            raise SystemExit("--plan-shards needs --plan to know where to write the plan")
+        plan = plan_shards(args.plan_shards, page_size_weights(args.author))
+        save_shard_plan(args.plan, plan)
+        for index, (start, end) in enumerate(plan, start=1):
+            print(f"Shard {index}/{args.plan_shards}: {from_global(start)} to {from_global(end)} ({end - start + 1} ayahs)")
+        return
+    
+    concurrency = _concurrency_from_args(args)
+    hedger = RequestHedger() if args.hedge else None
+    extractor = TafsirExtractor(tafsir_author=args.author, delay=args.delay, workers=args.workers,
+                                cache_mode=args.cache_mode, resume=args.resume, concurrency=concurrency,
+                                hedger=hedger, stream=args.stream)
+    try:
+        if args.merge_shards:
+            merged = extractor.merge_shards(args.merge_shards)
+            print(f"Merged {merged} records into data/{args.author}/")
+        elif args.shard:
+            shard_index, shard_count = args.shard
+            path = extractor.extract_shard(shard_index, shard_count, args.shard_plan)
+            print(f"Shard {shard_index}/{shard_count} written to {path}")
+            _print_fetch_stats(extractor.transfer_stats, concurrency, hedger)
+    finally:
+        extractor.close()
+        if hedger:
+            hedger.close()
 
 def main():
     """Main execution function"""
+    if len(sys.argv) > 1:
+        run_cli(parse_args())
+        return
+    
     print("=== Tafsir Content Extractor ===")
     
     # Ask user to select tafsir author
@@ -421,14 +3312,15 @@ def main():
         "4": ("tabari", "At-Tabari"),
         "5": ("qurtubi", "Al-Qurtubi"),
         "6": ("ibn-aashoor", "Ibn Ashur"),
-        "7": ("iraab-daas", "Iraab ul Quran")
+        "7": ("iraab-daas", "Iraab ul Quran"),
+        "8": ("all", "All authors")
     }
     
     print("\nAvailable Tafsir Authors:")
     for key, (author_key, author_name) in available_authors.items():
         print(f"{key}. {author_name} ({author_key})")
     
-    author_choice = input("Select tafsir author (1-5): ").strip()
+    author_choice = input("Select tafsir author (1-8): ").strip()
     
     if author_choice not in available_authors:
         print("Invalid choice. Defaulting to Al-Razi.")
@@ -437,6 +3329,19 @@ def main():
         author_key, author_name = available_authors[author_choice]
         print(f"Selected: {author_name}")
     
+    if author_key == "all":
+        # Mirror every author in one run with a shared rate budget
+        start_surah = int(input("Enter start surah number (1-114): "))
+        end_surah = int(input("Enter end surah number (1-114): "))
+        confirm = input(f"This will extract Surahs {start_surah}-{end_surah} from all authors. This may take hours. Continue? (yes/no): ")
+        if confirm.lower() == 'yes':
+            with MultiAuthorCrawler(delay=1.0, workers=4) as crawler:
+                counts = crawler.crawl(start_surah, end_surah)
+            print("\nExtraction completed!")
+            for key, count in counts.items():
+                print(f"- {AVAILABLE_AUTHORS[key]}: {count} ayahs in data/{key}/")
+        return
+    
     # Initialize extractor with selected author
     extractor = TafsirExtractor(tafsir_author=author_key, delay=1.0)
     
@@ -0,0 +1,211 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import main
+
+
+def brute_force_percentile(values, q):
+    """Smallest value that at least q percent of the values are less than or equal to"""
+    ordered = sorted(values)
+    for value in ordered:
+        if sum(v <= value for v in ordered) * 100 >= q * len(ordered):
+            return value
+    return ordered[-1]
+
+
+class PercentileTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertIsNone(main._percentile([], 50))
+
+    def test_matches_nearest_rank(self):
+        for n in range(1, 51):
+            values = [float(i) for i in range(n, 0, -1)]
+            for q in (1, 5, 10, 14, 25, 28, 50, 56, 75, 90, 95, 99, 100):
+                with self.subTest(n=n, q=q):
+                    self.assertEqual(main._percentile(values, q), brute_force_percentile(values, q))
+
+    def test_hedge_threshold_is_not_the_maximum(self):
+        values = [float(i) for i in range(1, 21)]
+        self.assertEqual(main._percentile(values, 95), 19.0)
+        self.assertEqual(main._percentile(values[:10], 50), 5.0)
+
+
+class WorkQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.now = 1000.0
+        clock = mock.patch.object(main.time, "time", side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        logging.disable(logging.INFO)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.queue = main.WorkQueue(Path(self.tmp.name) / "queue.db", lease_seconds=60,
+                                    max_attempts=2, retry_delay=10)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(self.queue.close)
+        self.assertEqual(self.queue.enqueue(["alrazi"], 1, 1), 7)
+
+    def state(self, task):
+        row = self.queue._conn.execute(
+            "SELECT state, attempts, worker, last_error FROM tasks WHERE author = ? AND surah = ? AND ayah = ?",
+            (task.author, task.surah, task.ayah)
+        ).fetchone()
+        return row
+
+    def test_enqueue_is_idempotent(self):
+        self.assertEqual(self.queue.enqueue(["alrazi"], 1, 2), 286)
+        self.assertEqual(self.queue.stats()["pending"], 7 + 286)
+
+    def test_enqueue_rejects_invalid_range(self):
+        with self.assertRaises(ValueError):
+            self.queue.enqueue(["alrazi"], 1, 115)
+
+    def test_lease_in_mushaf_order(self):
+        tasks = self.queue.lease("w1", 3)
+        self.assertEqual([(t.surah, t.ayah, t.attempts) for t in tasks], [(1, 1, 1), (1, 2, 1), (1, 3, 1)])
+        self.assertEqual(self.queue.stats()["leased"], 3)
+        self.assertEqual(len(self.queue.lease("w2", 10)), 4)
+        self.assertEqual(self.queue.lease("w3", 10), [])
+
+    def test_fail_then_retry_then_dead(self):
+        task, = self.queue.lease("w1", 1)
+        self.assertEqual(self.queue.fail(task, "w1", "boom"), "pending")
+        self.assertEqual(self.state(task), ("pending", 1, None, "boom"))
+
+        # Not available again until the retry delay has passed
+        self.assertNotIn((1, 1), [(t.surah, t.ayah) for t in self.queue.lease("w1", 10)])
+        self.now += 10
+        task, = self.queue.lease("w2", 1)
+        self.assertEqual((task.surah, task.ayah, task.attempts), (1, 1, 2))
+
+        self.assertEqual(self.queue.fail(task, "w2", "boom again"), "dead")
+        self.assertEqual(self.state(task), ("dead", 2, None, "boom again"))
+        self.assertEqual(self.queue.dead_letters(), [("alrazi", 1, 1, "boom again")])
+
+        self.assertEqual(self.queue.requeue_dead(), 1)
+        self.assertEqual(self.state(task)[:2], ("pending", 0))
+
+    def test_complete(self):
+        task, = self.queue.lease("w1", 1)
+        self.queue.complete(task, "w1")
+        self.assertEqual(self.state(task), ("done", 1, "w1", None))
+        self.assertEqual(self.queue.stats()["done"], 1)
+
+    def test_expired_lease_is_leased_again(self):
+        task, = self.queue.lease("w1", 1)
+        self.now += 59
+        self.assertNotIn((1, 1), [(t.surah, t.ayah) for t in self.queue.lease("w2", 10)])
+        self.now += 1
+        again = self.queue.lease("w3", 1)
+        self.assertEqual([(t.surah, t.ayah, t.attempts) for t in again], [(1, 1, 2)])
+        self.assertEqual(self.state(task)[:3], ("leased", 2, "w3"))
+
+        # The first worker's late failure does not touch the new lease
+        self.assertEqual(self.queue.fail(task, "w1", "late"), "leased")
+        self.assertEqual(self.state(task)[:3], ("leased", 2, "w3"))
+
+    def test_expired_last_lease_is_dead(self):
+        task, = self.queue.lease("w1", 1)
+        self.now += 60
+        self.queue.lease("w2", 1)
+        self.now += 60
+        self.assertNotIn((1, 1), [(t.surah, t.ayah) for t in self.queue.lease("w3", 10)])
+        self.assertEqual(self.state(task), ("dead", 2, None, "lease expired"))
+
+    def test_complete_after_expiry(self):
+        task, = self.queue.lease("w1", 1)
+        self.now += 60
+        self.queue.lease("w2", 1)
+        self.queue.complete(task, "w1")
+        self.assertEqual(self.state(task)[:3], ("done", 2, "w1"))
+        # The worker that took over finds the task already done
+        self.assertEqual(self.queue.fail(task, "w2", "too late"), "done")
+        self.assertEqual(self.state(task)[0], "done")
+
+    def test_is_drained(self):
+        tasks = self.queue.lease("w1", 7)
+        self.assertFalse(self.queue.is_drained())
+        for task in tasks[:-1]:
+            self.queue.complete(task, "w1")
+        self.queue.fail(tasks[-1], "w1", "boom")
+        self.assertFalse(self.queue.is_drained())
+        self.now += 10
+        self.queue.fail(self.queue.lease("w1", 1)[0], "w1", "boom")
+        self.assertTrue(self.queue.is_drained())
+
+
+class ShardPlanTest(unittest.TestCase):
+    def assert_covers(self, plan, shard_count):
+        self.assertEqual(len(plan), shard_count)
+        self.assertEqual(plan[0][0], 1)
+        self.assertEqual(plan[-1][1], main.TOTAL_AYAHS)
+        for (start, end), (next_start, _) in zip(plan, plan[1:]):
+            self.assertLessEqual(start, end)
+            self.assertEqual(next_start, end + 1)
+
+    def test_even_split(self):
+        for shard_count in (1, 2, 3, 7, 8, 100, main.TOTAL_AYAHS):
+            with self.subTest(shard_count=shard_count):
+                plan = main.plan_shards(shard_count)
+                self.assert_covers(plan, shard_count)
+                sizes = [end - start + 1 for start, end in plan]
+                self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_weighted_split(self):
+        weights = [float((i * 7919) % 97 + 1) for i in range(main.TOTAL_AYAHS)]
+        for shard_count in (2, 5, 16, 64):
+            with self.subTest(shard_count=shard_count):
+                plan = main.plan_shards(shard_count, weights)
+                self.assert_covers(plan, shard_count)
+                fair = sum(weights) / shard_count
+                for start, end in plan:
+                    self.assertLessEqual(abs(sum(weights[start - 1:end]) - fair), 2 * max(weights))
+
+    def test_heavy_tail_still_gives_every_shard_an_ayah(self):
+        weights = [0.0] * (main.TOTAL_AYAHS - 1) + [1.0]
+        self.assert_covers(main.plan_shards(4, weights), 4)
+
+    def test_invalid(self):
+        for shard_count in (0, main.TOTAL_AYAHS + 1):
+            with self.assertRaises(ValueError):
+                main.plan_shards(shard_count)
+        with self.assertRaises(ValueError):
+            main.plan_shards(2, [1.0] * 10)
+
+    def test_plan_file_round_trip(self):
+        plan = main.plan_shards(5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "plan.json"
+            main.save_shard_plan(path, plan)
+            self.assertEqual(main.load_shard_plan(path), plan)
+
+
+class GlobalIndexTest(unittest.TestCase):
+    def test_round_trip(self):
+        expected = 1
+        for surah, info in main.SURAH_INFO.items():
+            for ayah in range(1, info.total_ayahs + 1):
+                self.assertEqual(main.global_index(surah, ayah), expected)
+                self.assertEqual(main.from_global(expected), (surah, ayah))
+                expected += 1
+        self.assertEqual(expected - 1, main.TOTAL_AYAHS)
+        self.assertEqual(main.TOTAL_AYAHS, 6236)
+
+    def test_iter_ayahs(self):
+        self.assertEqual(list(main.iter_ayahs(7, 9)), [(1, 7), (2, 1), (2, 2)])
+        self.assertEqual(len(list(main.iter_ayahs())), main.TOTAL_AYAHS)
+
+    def test_invalid(self):
+        for surah, ayah in ((0, 1), (115, 1), (1, 0), (1, 8)):
+            with self.assertRaises(ValueError):
+                main.global_index(surah, ayah)
+        for index in (0, main.TOTAL_AYAHS + 1):
+            with self.assertRaises(ValueError):
+                main.from_global(index)
+
+
+if __name__ == "__main__":
+    unittest.main()